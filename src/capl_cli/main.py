@@ -7,8 +7,10 @@ from capl_linter.autofix import AutoFixEngine
 from capl_linter.engine import LinterEngine
 from capl_linter.registry import registry
 from capl_symbol_db.database import SymbolDatabase
+from capl_symbol_db.dependency import DependencyAnalyzer
 from capl_symbol_db.extractor import SymbolExtractor
 from capl_symbol_db.xref import CrossReferenceBuilder
+from capl_tree_sitter import CAPLParser, read_source
 
 from .config import FormatConfig, LintConfig
 from .converters import internal_issue_to_lint_issue
@@ -40,8 +42,8 @@ def lint(
     elif files:
         # Even for single files, scan surrounding folder for better context
         # (Heuristic: scan same directory to find local includes/definitions)
-        for f in files:
-            engine.analyze_project(f.parent)
+        for parent in dict.fromkeys(f.parent for f in files):
+            engine.analyze_project(parent)
 
     if not files:
         typer.echo("Error: Provide files or use --project")
@@ -51,10 +53,18 @@ def lint(
         max_passes = 10
         passes = 0
         current_issues = []
+        # Content we last wrote; lets the next fix pass skip re-reading the file
+        content = None
 
         while passes < max_passes:
             passes += 1
-            current_issues = engine.analyze_file(file_path, force=(passes > 1), rules=enabled_rules)
+            # The project scan above already brought .can/.cin files up to date
+            current_issues = engine.analyze_file(
+                file_path,
+                force=(passes > 1),
+                rules=enabled_rules,
+                assume_analyzed=file_path.suffix in (".can", ".cin"),
+            )
 
             if not fix:
                 break
@@ -82,14 +92,16 @@ def lint(
                 f"  🔧 Applying fixes for {target_rule} ({len(rule_issues)} issues) in {file_path.name}..."
             )
 
-            new_content = autofix.apply_fixes(file_path, rule_issues)
-            file_path.write_text(new_content, encoding="utf-8")
+            content = autofix.apply_fixes(file_path, rule_issues, content)
+            file_path.write_text(content, encoding="utf-8")
 
             if passes == max_passes:
                 typer.echo(f"Warning: Reached max fix passes for {file_path}")
 
         all_issues.extend(current_issues)
 
+    engine.close()
+
     # Convert to external models and print (simplified report for now)
     external_issues = [internal_issue_to_lint_issue(i) for i in all_issues]
 
@@ -97,17 +109,32 @@ def lint(
     severity_rank = {"ERROR": 3, "WARNING": 2, "STYLE": 1}
     min_rank = severity_rank.get(severity.upper(), 1)
 
-    reported_count = 0
-    for issue in sorted(external_issues, key=lambda x: (x.file_path, x.line_number)):
+    # One pass counts errors and keeps only the issues that will be printed,
+    # so only those are sorted and formatted
+    shown = []
+    errors = 0
+    for issue in external_issues:
+        if issue.severity == "ERROR":
+            errors += 1
         if severity_rank.get(issue.severity, 0) >= min_rank:
-            typer.echo(
-                f"{issue.severity}: {issue.file_path}:{issue.line_number} [{issue.rule_id}] - {issue.message}"
-            )
-            reported_count += 1
+            shown.append(issue)
+
+    # Order files once, then sort issues on integer keys instead of
+    # comparing the (mostly equal) path strings of every issue pair
+    path_ids = {p: n for n, p in enumerate(sorted({issue.file_path for issue in shown}))}
+    shown.sort(key=lambda x: (path_ids[x.file_path], x.line_number))
+
+    # Build the whole report and write it once rather than once per issue
+    report = [
+        f"{issue.severity}: {issue.file_path}:{issue.line_number} [{issue.rule_id}] - {issue.message}"
+        for issue in shown
+    ]
+    reported_count = len(report)
+    if report:
+        typer.echo("\n".join(report))
 
     typer.echo(f"\nTotal issues found: {len(external_issues)} ({reported_count} reported)")
 
-    errors = sum(1 for i in external_issues if i.severity == "ERROR")
     if errors > 0:
         raise typer.Exit(code=1)
 
@@ -187,6 +214,7 @@ def format(
             )
         )
     else:
+        report = []
         for r in results:
             status = "MODIFIED" if r["modified"] else "UNCHANGED"
             if check and r["modified"]:
@@ -194,10 +222,12 @@ def format(
 
             if r["errors"]:
                 status = "ERROR"
-                typer.echo(f"{status}: {r['file']} - {r['errors'][0]}")
+                report.append(f"{status}: {r['file']} - {r['errors'][0]}")
             else:
                 if r["modified"] or not check:
-                    typer.echo(f"{status}: {r['file']}")
+                    report.append(f"{status}: {r['file']}")
+        if report:
+            typer.echo("\n".join(report))
 
         typer.echo(
             f"\nSummary: {len(files)} files processed. {modified_count} modified, {error_count} errors."
@@ -217,19 +247,26 @@ def analyze(
 ):
     """Analyze dependencies and symbols"""
     database = SymbolDatabase(db)
-    extractor = SymbolExtractor()
-    xref = CrossReferenceBuilder(database)
+    parser = CAPLParser()
+    extractor = SymbolExtractor(parser=parser)
+    xref = CrossReferenceBuilder(database, parser=parser)
+    dep_analyzer = DependencyAnalyzer(database, parser=parser)
 
+    num_syms = {}
     for file_path in files:
         typer.echo(f"Analyzing {file_path}...")
         syms = extractor.extract_all(file_path)
 
-        with open(file_path, "rb") as f:
-            file_id = database.store_file(file_path, f.read())
+        file_id = database.store_file(file_path, read_source(file_path))
         database.store_symbols(file_id, syms)
-
-        num_refs = xref.analyze_file_references(file_path)
-        typer.echo(f"  ✓ {len(syms)} symbols, {num_refs} references")
+        num_syms[file_path.resolve()] = len(syms)
+
+    # Reference and include extraction parse every file; spread them over worker processes
+    num_refs = xref.analyze_files(files)
+    dep_analyzer.analyze_files(files)
+    for file_path, count in num_syms.items():
+        typer.echo(f"  ✓ {file_path.name}: {count} symbols, {num_refs[file_path]} references")
+    database.close()
 
 
 @app.command()
@@ -187,15 +187,15 @@ class FormatterEngine:
         """Builds a map of comment attachments."""
         comments = self._find_all_comments(tree)
         attachment_map = {}
-        lines = source.splitlines(keepends=True)
 
+        # Classification only needs node positions, so the source is not split
         for comment in comments:
-            attachment = self._classify_comment(comment, lines)
+            attachment = self._classify_comment(comment)
             attachment_map[comment.start_byte] = attachment
 
         return attachment_map
 
-    def _classify_comment(self, comment_node, source_lines: list[str]) -> CommentAttachment:
+    def _classify_comment(self, comment_node) -> CommentAttachment:
         """Determines the type of comment and its target node."""
         prev_sibling = comment_node.prev_sibling
         next_sibling = comment_node.next_sibling
@@ -266,7 +266,6 @@ class FormatterEngine:
             if not parse_result.tree or not parse_result.tree.root_node:
                 return source
 
-            lines = source.splitlines(keepends=True)
             top_level_lines = set()
 
             # Find all direct children of translation_unit (top-level nodes)
@@ -276,13 +275,27 @@ class FormatterEngine:
 
                 top_level_lines.add(child.start_point[0])
 
-            # Rebuild source with normalized indentation
+            # Only top-level lines are touched, so slice them out of the source
+            # through a line-offset table instead of splitting every line
+            offsets = [0]
+            newline = source.find("\n")
+            while newline != -1:
+                offsets.append(newline + 1)
+                newline = source.find("\n", newline + 1)
+            offsets.append(len(source))
+
             normalized = []
-            for i, line in enumerate(lines):
-                if i in top_level_lines and line.strip():
+            prev_end = 0
+            for row in sorted(top_level_lines):
+                if row + 1 >= len(offsets):
+                    continue
+                start, end = offsets[row], offsets[row + 1]
+                line = source[start:end]
+                if line.strip():
+                    normalized.append(source[prev_end:start])
                     normalized.append(line.lstrip())
-                else:
-                    normalized.append(line)
+                    prev_end = end
+            normalized.append(source[prev_end:])
 
             return "".join(normalized)
 
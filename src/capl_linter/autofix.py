@@ -7,15 +7,27 @@ from .registry import registry
 class AutoFixEngine:
     """Automatically fix linting issues by delegating to rules"""
 
-    def apply_fixes(self, file_path: Path, issues: list[InternalIssue]) -> str:
+    def apply_fixes(
+        self, file_path: Path, issues: list[InternalIssue], content: str | None = None
+    ) -> str:
+        """Apply fixes for one rule and return the new file content.
+
+        Args:
+            file_path: Path to the file being fixed
+            issues: Issues to fix (the first issue's rule is applied)
+            content: Current file content, if already in memory (read from disk otherwise)
+        """
+        if content is None:
+            content = file_path.read_text(encoding="utf-8")
         if not issues:
-            return file_path.read_text(encoding="utf-8")
+            return content
 
         # Group issues by rule_id and apply one rule type at a time for safety
         rule_id = issues[0].rule_id
         rule = registry.get_rule(rule_id)
 
         if rule and rule.auto_fixable:
-            return rule.fix(file_path, issues)
+            # Split once here; rules work on the line list and we join once
+            return "\n".join(rule.fix_lines(content.split("\n"), issues))
 
-        return file_path.read_text(encoding="utf-8")
+        return content
@@ -6,10 +6,12 @@ from capl_symbol_db.database import SymbolDatabase
 from capl_symbol_db.dependency import DependencyAnalyzer
 from capl_symbol_db.extractor import SymbolExtractor
 from capl_symbol_db.xref import CrossReferenceBuilder
+from capl_tree_sitter import CAPLParser, read_source
 
 from .models import InternalIssue
 from .registry import RuleRegistry
 from .rules.base import BaseRule
+from .rules.tree_helpers import ParsedFile
 
 
 class LinterEngine:
@@ -18,15 +20,34 @@ class LinterEngine:
     def __init__(self, db_path: str = "aic.db", custom_builtins: list[str] | None = None):
         self.db_path = db_path
         self.db = SymbolDatabase(db_path)
-        self.extractor = SymbolExtractor()
-        self.xref = CrossReferenceBuilder(self.db)
-        self.dep_analyzer = DependencyAnalyzer(self.db)
+        # One tree-sitter parser serves every analysis stage
+        self.parser = CAPLParser()
+        self.extractor = SymbolExtractor(parser=self.parser)
+        self.xref = CrossReferenceBuilder(self.db, parser=self.parser)
+        self.dep_analyzer = DependencyAnalyzer(self.db, parser=self.parser)
         self.registry = RuleRegistry()
         self.issues: list[InternalIssue] = []
         self.custom_builtins = custom_builtins or []
+        # Duplicate function names from the last project scan, dropped as
+        # soon as this engine stores a file again
+        self._duplicate_names: set[str] | None = None
+
+    def close(self) -> None:
+        """Close the symbol database connections"""
+        self.db.close()
+
+    def __enter__(self) -> LinterEngine:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def analyze_file(
-        self, file_path: Path, force: bool = False, rules: list[BaseRule] | None = None
+        self,
+        file_path: Path,
+        force: bool = False,
+        rules: list[BaseRule] | None = None,
+        assume_analyzed: bool = False,
     ) -> list[InternalIssue]:
         """Run lint checks on a file.
 
@@ -34,56 +55,90 @@ class LinterEngine:
             file_path: Path to the file
             force: Whether to re-analyze even if hash matches
             rules: Specific rules to run (if None, all registered rules are run)
+            assume_analyzed: Skip the change check, e.g. right after
+                analyze_project covered this file
         """
-        file_path = file_path.resolve()
+        # Repeated runs on the same path reuse the database's resolved form
+        file_path = Path(self.db.resolve_path(file_path))
 
-        # Ensure file is analyzed
-        if force or self._needs_analysis(file_path):
+        # Ensure file is analyzed; the bytes read for the change check are
+        # handed on to every analysis stage
+        source = None
+        if force:
             self._analyze_single_file(file_path)
+        elif not assume_analyzed:
+            source = read_source(file_path)
+            if self._hash_changed(source, self.db.get_file_hash(file_path)):
+                self._analyze_single_file(file_path, source)
 
         self.issues = []
         target_rules = rules if rules is not None else self.registry.get_all_rules()
+        # The AST rules of this pass share one read and one parse of the file
+        parsed = ParsedFile(file_path, self.parser, source)
 
         for rule in target_rules:
             # Inject custom builtins into semantic rules if they support it
             if hasattr(rule, "custom_builtins"):
                 rule.custom_builtins = self.custom_builtins
+            if hasattr(rule, "duplicate_names"):
+                rule.duplicate_names = self._duplicate_names
+            if hasattr(rule, "parsed_file"):
+                rule.parsed_file = parsed
             self.issues.extend(rule.check(file_path, self.db))
+            if hasattr(rule, "parsed_file"):
+                # The tree is not kept past this file's pass
+                rule.parsed_file = None
 
-        return sorted(self.issues, key=lambda x: x.sort_key)
+        # Each file's issues are sorted once, in place
+        self.issues.sort(key=lambda x: x.sort_key)
+        return self.issues
 
     def analyze_project(self, root_path: Path) -> int:
         """Scan all CAPL files in a directory to populate the database"""
         root_path = Path(root_path).resolve()
-        count = 0
+        # Changed file -> its contents, handed on to the include analysis
+        changed: dict[Path, bytes] = {}
+        # One query for every stored hash instead of a lookup per file
+        stored_hashes = self.db.get_file_hashes()
 
         # Find all .can and .cin files
         for ext in ["**/*.can", "**/*.cin"]:
             for file_path in root_path.glob(ext):
-                if self._needs_analysis(file_path):
-                    self._analyze_single_file(file_path)
-                    count += 1
-
-        return count
-
-    def _analyze_single_file(self, file_path: Path):
+                stored_hash = stored_hashes.get(self.db.resolve_path(file_path))
+                source = read_source(file_path)
+                if self._hash_changed(source, stored_hash):
+                    self._analyze_symbols(file_path, source)
+                    changed[file_path] = source
+
+        # Includes of all changed files are resolved and stored in one batch
+        if changed:
+            self.dep_analyzer.analyze_files(list(changed), max_workers=1, sources=changed)
+        # With the project stored, one pass finds every duplicated function name
+        self._duplicate_names = self.db.get_duplicate_function_names()
+        return len(changed)
+
+    def _analyze_single_file(self, file_path: Path, source: bytes | None = None):
         """Perform symbol extraction and XRef/Dependency analysis for one file"""
+        if source is None:
+            source = read_source(file_path)
+        file_id = self._analyze_symbols(file_path, source)
+        self.dep_analyzer.analyze_file(file_path, file_id, source)
+
+    def _analyze_symbols(self, file_path: Path, source: bytes) -> int:
+        """Store a file with its symbols and references, returning its file_id"""
+        self._duplicate_names = None
         syms = self.extractor.extract_all(file_path)
-        with open(file_path, "rb") as f:
-            source_code = f.read()
-            file_id = self.db.store_file(file_path, source_code)
+        file_id = self.db.store_file(file_path, source)
         self.db.store_symbols(file_id, syms)
-        self.xref.analyze_file_references(file_path)
-        self.dep_analyzer.analyze_file(file_path)
+        self.xref.analyze_file_references(file_path, file_id, source)
+        return file_id
 
-    def _needs_analysis(self, file_path: Path) -> bool:
-        stored_hash = self.db.get_file_hash(file_path)
+    def _hash_changed(self, source: bytes, stored_hash: str | None) -> bool:
         if not stored_hash:
             return True
 
         import hashlib
 
-        with open(file_path, "rb") as f:
-            current_hash = hashlib.md5(f.read()).hexdigest()
+        current_hash = hashlib.md5(source).hexdigest()
 
         return stored_hash != current_hash
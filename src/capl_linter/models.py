@@ -9,7 +9,7 @@ class Severity(Enum):
     STYLE = "style"
 
 
-@dataclass
+@dataclass(slots=True)
 class InternalIssue:
     """Internal representation of a linting issue."""
 
@@ -52,7 +52,20 @@ class BaseRule(ABC):
         Returns:
             Modified file content as a string
         """
-        return file_path.read_text(encoding="utf-8")
+        lines = file_path.read_text(encoding="utf-8").split("\n")
+        return "\n".join(self.fix_lines(lines, issues))
+
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
+        """Apply auto-fixes to already split file content.
+
+        Args:
+            lines: File content split on newlines (may be modified in place)
+            issues: List of issues to fix (all belonging to this rule)
+
+        Returns:
+            The fixed lines
+        """
+        return lines
 
     # Helper method for consistent issue creation
     def _create_issue(
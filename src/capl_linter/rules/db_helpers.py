@@ -1,6 +1,5 @@
 """Database query helpers to reduce SQL duplication in rules."""
 
-import sqlite3
 from pathlib import Path
 from typing import Any
 
@@ -12,7 +11,7 @@ class RuleQueryHelper:
 
     def __init__(self, db: SymbolDatabase, file_path: Path):
         self.db = db
-        self.file_path_abs = str(file_path.resolve())
+        self.file_path = file_path
 
     def query_symbols(
         self,
@@ -25,53 +24,24 @@ class RuleQueryHelper:
 
         Returns list of tuples: (symbol_name, line_number, context, ...)
         """
-        conn = sqlite3.connect(self.db.db_path)
-
-        try:
-            conditions = ["f.file_path = ?"]
-            params = [self.file_path_abs]
-
-            if symbol_type:
-                conditions.append("s.symbol_type = ?")
-                params.append(symbol_type)
-
-            if scope:
-                conditions.append("s.scope = ?")
-                params.append(scope)
-
-            if context:
-                conditions.append("s.context = ?")
-                params.append(context)
-
-            if contexts:
-                placeholders = ",".join("?" * len(contexts))
-                conditions.append(f"s.context IN ({placeholders})")
-                params.extend(contexts)
-
-            where_clause = " AND ".join(conditions)
-
-            query = f"""
-                SELECT s.symbol_name, s.line_number, s.context,
-                       s.signature, s.parent_symbol, s.declaration_position
-                FROM symbols s
-                JOIN files f ON s.file_id = f.file_id
-                WHERE {where_clause}
-            """
-
-            cursor = conn.execute(query, params)
-            return cursor.fetchall()
-
-        finally:
-            conn.close()
+        return [
+            row[:6]
+            for row in self.db.get_file_symbols(self.file_path)
+            if (not symbol_type or row[6] == symbol_type)
+            and (not scope or row[7] == scope)
+            and (not context or row[2] == context)
+            and (not contexts or row[2] in contexts)
+        ]
 
     def get_forbidden_syntax(self) -> list[tuple[str, int, str]]:
         """Get all forbidden syntax items (extern, function declarations)."""
         results = self.query_symbols(symbol_type="forbidden_syntax")
         return [(name, line, ctx) for name, line, ctx, _, _, _ in results]
 
-    def get_type_usage_errors(self) -> list[tuple[str, int, str, str]]:
-        """Get variables missing enum/struct keywords."""
-        results = self.query_symbols(symbol_type="type_usage_error")
+    def get_type_usage_errors(self, keyword: str | None = None) -> list[tuple[str, int, str, str]]:
+        """Get variables missing enum/struct keywords (only `keyword` if given)."""
+        context = f"missing_{keyword}_keyword" if keyword else None
+        results = self.query_symbols(symbol_type="type_usage_error", context=context)
         return [(name, line, ctx, sig) for name, line, ctx, sig, _, _ in results]
 
     def get_global_variables(self) -> list[tuple[str, int]]:
@@ -81,20 +51,10 @@ class RuleQueryHelper:
 
     def get_mid_block_variables(self) -> list[tuple[str, int, str]]:
         """Get local variables declared after statements."""
-        conn = sqlite3.connect(self.db.db_path)
-        try:
-            cursor = conn.execute(
-                """
-                SELECT s.symbol_name, s.line_number, s.parent_symbol
-                FROM symbols s
-                JOIN files f ON s.file_id = f.file_id
-                WHERE f.file_path = ?
-                  AND s.symbol_type = 'variable'
-                  AND s.scope = 'local'
-                  AND s.declaration_position = 'mid_block'
-                """,
-                (self.file_path_abs,),
+        return [
+            (name, line, parent)
+            for name, line, _, _, parent, position, symbol_type, scope, _ in (
+                self.db.get_file_symbols(self.file_path)
             )
-            return cursor.fetchall()
-        finally:
-            conn.close()
+            if symbol_type == "variable" and scope == "local" and position == "mid_block"
+        ]
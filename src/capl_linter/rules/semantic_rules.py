@@ -1,4 +1,4 @@
-import sqlite3
+from functools import lru_cache
 from pathlib import Path
 
 from capl_symbol_db.database import SymbolDatabase
@@ -8,6 +8,12 @@ from ..models import InternalIssue, Severity
 from .base import BaseRule
 
 
+@lru_cache(maxsize=4096)
+def _file_name(file_path: str) -> str:
+    """Base name of a stored file path; the same few files recur across issues"""
+    return Path(file_path).name
+
+
 class UndefinedSymbolRule(BaseRule):
     """E011: Detect undefined symbols (variables/functions)"""
 
@@ -17,49 +23,60 @@ class UndefinedSymbolRule(BaseRule):
     description = "Symbol is not defined in the current file or its transitive includes."
 
     def __init__(self):
-        self.custom_builtins: list[str] = []
+        self._custom_builtins: list[str] = []
+        self._builtin_names = CAPL_BUILTINS
+
+    @property
+    def custom_builtins(self) -> list[str]:
+        return self._custom_builtins
+
+    @custom_builtins.setter
+    def custom_builtins(self, names: list[str]):
+        # The engine assigns the names before every file; the combined set is
+        # only rebuilt when the configuration actually changes
+        if names == self._custom_builtins:
+            return
+        self._custom_builtins = list(names)
+        self._builtin_names = CAPL_BUILTINS.union(names)
 
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
         issues = []
-        visible = db.get_visible_symbols(file_path)
 
-        # Create sets for fast lookup
-        known_symbols = set(CAPL_BUILTINS)
-        known_symbols.update(self.custom_builtins)
-        for s_list in visible.values():
-            for s in s_list:
-                known_symbols.add(s["symbol_name"])
+        # One set of names for fast lookup, built by a single DISTINCT query
+        known_symbols = db.get_visible_symbol_names(file_path)
+        builtin_names = self._builtin_names
 
         # Query all references in the current file
-        conn = sqlite3.connect(db.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            cursor = conn.execute(
-                """
-                SELECT symbol_name, line_number, column_number, reference_type
-                FROM symbol_references
-                WHERE file_id = (SELECT file_id FROM files WHERE file_path = ?)
-                """,
-                (str(file_path.resolve()),),
-            )
-
-            for ref in cursor.fetchall():
-                name = ref["symbol_name"]
-                if name not in known_symbols:
-                    # Ignore some special cases or built-ins that might be missing from our list
-                    if name.startswith("on"):
-                        continue
-
-                    issues.append(
-                        self._create_issue(
-                            file_path=file_path,
-                            line=ref["line_number"],
-                            column=ref["column_number"],
-                            message=f"Undefined symbol '{name}'",
-                        )
+        conn = db.reader
+        cursor = conn.execute(
+            """
+            SELECT symbol_name, line_number, column_number
+            FROM symbol_references
+            WHERE file_id = ?
+            """,
+            (db.get_file_id(file_path),),
+        )
+
+        references = cursor.fetchall()
+
+        # Names repeat across references, so resolve each distinct name once
+        # with set differences and leave a single membership test per row
+        undefined = {name for name, _, _ in references}
+        undefined -= known_symbols
+        undefined -= builtin_names
+        # Ignore some special cases or built-ins that might be missing from our list
+        undefined = {name for name in undefined if not name.startswith("on")}
+
+        for name, line, column in references:
+            if name in undefined:
+                issues.append(
+                    self._create_issue(
+                        file_path=file_path,
+                        line=line,
+                        column=column,
+                        message=f"Undefined symbol '{name}'",
                     )
-        finally:
-            conn.close()
+                )
 
         return issues
 
@@ -72,57 +89,62 @@ class DuplicateFunctionRule(BaseRule):
     severity = Severity.ERROR
     description = "Multiple definitions of the same function with the same parameter count."
 
+    def __init__(self):
+        # Names duplicated anywhere in the project, set by the engine after a
+        # project scan; None means every file runs the per-file join
+        self.duplicate_names: set[str] | None = None
+
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
-        issues = []
-        conn = sqlite3.connect(db.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            # Query functions in this file
-            cursor = conn.execute(
-                """
-                SELECT s.symbol_name, s.param_count, s.line_number
-                FROM symbols s
-                JOIN files f ON s.file_id = f.file_id
-                WHERE f.file_path = ? AND s.symbol_type = 'function'
-                """,
-                (str(file_path.resolve()),),
-            )
-            local_funcs = cursor.fetchall()
-
-            for func in local_funcs:
-                name = func["symbol_name"]
-                p_count = func["param_count"]
-
-                # Check if this name/p_count exists elsewhere
-                # (We use param_count to allow overloading if CAPL supports it,
-                # or at least to be more specific)
-                check_cursor = conn.execute(
-                    """
-                    SELECT f.file_path, s.line_number
-                    FROM symbols s
-                    JOIN files f ON s.file_id = f.file_id
-                    WHERE s.symbol_name = ? 
-                      AND s.param_count = ?
-                      AND s.symbol_type = 'function'
-                      AND (f.file_path != ? OR s.line_number != ?)
-                    """,
-                    (name, p_count, str(file_path.resolve()), func["line_number"]),
-                )
-                duplicates = check_cursor.fetchall()
-
-                if duplicates:
-                    dup_locs = [
-                        f"{Path(d['file_path']).name}:{d['line_number']}" for d in duplicates
-                    ]
-                    issues.append(
-                        self._create_issue(
-                            file_path=file_path,
-                            line=func["line_number"],
-                            message=f"Duplicate function definition '{name}' (also in: {', '.join(dup_locs)})",
-                        )
+        issues: list[InternalIssue] = []
+        # Most files define no duplicated name; the project-wide candidates
+        # rule them out without the per-file join
+        candidates = self.duplicate_names
+        if candidates is not None and not any(
+            symbol_type == "function" and name in candidates
+            for name, *_, symbol_type, _, _ in db.get_file_symbols(file_path)
+        ):
+            return issues
+
+        conn = db.reader
+        # Every function in this file joined to its other definitions with the
+        # same name and parameter count; a function without any gets one row
+        # with NULLs. (We use param_count to allow overloading if CAPL supports
+        # it, or at least to be more specific)
+        cursor = conn.execute(
+            """
+            SELECT l.symbol_id, l.symbol_name, l.line_number, o.line_number, fo.file_path
+            FROM symbols l
+            LEFT JOIN symbols o
+              ON o.symbol_name = l.symbol_name
+             AND o.symbol_type = 'function'
+             AND o.param_count = l.param_count
+             AND (o.file_id != l.file_id OR o.line_number != l.line_number)
+            LEFT JOIN files fo ON o.file_id = fo.file_id
+            WHERE l.file_id = ? AND l.symbol_type = 'function'
+            ORDER BY l.symbol_id, o.symbol_id
+            """,
+            (db.get_file_id(file_path),),
+        )
+
+        duplicates: dict[int, list[str]] = {}
+        functions: list[tuple[int, str, int]] = []
+        for symbol_id, name, line, dup_line, dup_path in cursor:
+            if symbol_id not in duplicates:
+                duplicates[symbol_id] = []
+                functions.append((symbol_id, name, line))
+            if dup_path is not None:
+                duplicates[symbol_id].append(f"{_file_name(dup_path)}:{dup_line}")
+
+        for symbol_id, name, line in functions:
+            dup_locs = duplicates[symbol_id]
+            if dup_locs:
+                issues.append(
+                    self._create_issue(
+                        file_path=file_path,
+                        line=line,
+                        message=f"Duplicate function definition '{name}' (also in: {', '.join(dup_locs)})",
                     )
-        finally:
-            conn.close()
+                )
 
         return issues
 
@@ -143,7 +165,7 @@ class CircularIncludeRule(BaseRule):
 
         for cycle in cycles:
             # Format the cycle for the message
-            cycle_names = [Path(p).name for p in cycle]
+            cycle_names = [_file_name(p) for p in cycle]
             issues.append(
                 self._create_issue(
                     file_path=file_path,
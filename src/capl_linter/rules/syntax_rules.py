@@ -1,5 +1,4 @@
 import re
-import sqlite3
 from pathlib import Path
 
 from capl_symbol_db.database import SymbolDatabase
@@ -8,9 +7,27 @@ from capl_tree_sitter import ASTWalker, CAPLParser, CAPLPatterns
 from ..models import InternalIssue, Severity
 from .base import BaseRule
 from .db_helpers import RuleQueryHelper
+from .text_helpers import find_block_end, line_index, line_offsets
+from .tree_helpers import ParsedFile
 
+EXTERN_PATTERN = re.compile(r"\bextern\s+")
 
-class ExternKeywordRule(BaseRule):
+
+class _TreeRule(BaseRule):
+    """Base for rules that inspect the parse tree."""
+
+    # Set by the engine for one file's lint pass, so the rules of that pass
+    # read and parse the file once between them
+    parsed_file: ParsedFile | None = None
+
+    def _parsed(self, file_path: Path) -> ParsedFile:
+        parsed = self.parsed_file
+        if parsed is None or parsed.file_path != file_path:
+            parsed = ParsedFile(file_path, CAPLParser())
+        return parsed
+
+
+class ExternKeywordRule(_TreeRule):
     """Detect and remove 'extern' keyword (not supported in CAPL)."""
 
     rule_id = "E001"
@@ -20,12 +37,18 @@ class ExternKeywordRule(BaseRule):
     description = "The 'extern' keyword is not supported in CAPL and must be removed."
 
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
-        parser = CAPLParser()
-        result = parser.parse_file(file_path)
+        parsed = self._parsed(file_path)
+        source = parsed.source
+        # Cheap C-level scan first; most files never need the parse
+        if b"extern" not in source:
+            return []
+
+        # Only the tree is needed: no decoded copy and no syntax error scan
+        root = parsed.root
         issues = []
 
-        for decl in ASTWalker.find_all_by_type(result.tree.root_node, "declaration"):
-            if CAPLPatterns.has_extern_keyword(decl, result.source):
+        for decl in ASTWalker.find_all_by_type(root, "declaration"):
+            if CAPLPatterns.has_extern_keyword(decl, source):
                 issues.append(
                     self._create_issue(
                         file_path=file_path,
@@ -38,13 +61,12 @@ class ExternKeywordRule(BaseRule):
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
         for issue in sorted(issues, key=lambda x: x.line, reverse=True):
             idx = issue.line - 1
             if idx < len(lines):
-                lines[idx] = re.sub(r"\bextern\s+", "", lines[idx], count=1)
-        return "\n".join(lines)
+                lines[idx] = EXTERN_PATTERN.sub("", lines[idx], count=1)
+        return lines
 
 
 class FunctionDeclarationRule(BaseRule):
@@ -58,50 +80,33 @@ class FunctionDeclarationRule(BaseRule):
 
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
         issues = []
-        conn = sqlite3.connect(db.db_path)
-        try:
-            cursor = conn.execute(
-                """
-                SELECT s.symbol_name, s.line_number
-                FROM symbols s
-                JOIN files f ON s.file_id = f.file_id
-                WHERE f.file_path = ?
-                  AND s.symbol_type = 'function'
-                  AND s.has_body = 0
-                """,
-                (str(file_path.resolve()),),
-            )
-            for name, line in cursor.fetchall():
-                issues.append(
-                    self._create_issue(
-                        file_path=file_path,
-                        line=line,
-                        message=f"Function forward declaration '{name}' is not allowed in CAPL",
-                        context="function_declaration",
-                    )
+        for name, line, *_, symbol_type, _, has_body in db.get_file_symbols(file_path):
+            if symbol_type != "function" or has_body != 0:
+                continue
+            issues.append(
+                self._create_issue(
+                    file_path=file_path,
+                    line=line,
+                    message=f"Function forward declaration '{name}' is not allowed in CAPL",
+                    context="function_declaration",
                 )
-        finally:
-            conn.close()
+            )
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
-        for issue in sorted(issues, key=lambda x: x.line, reverse=True):
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
+        to_remove: set[int] = set()
+        for issue in issues:
             line_idx = issue.line - 1
             if line_idx >= len(lines):
                 continue
 
-            if ";" in lines[line_idx]:
-                lines.pop(line_idx)
-            else:
-                # Handle multi-line declaration (simple search for ;)
-                for i in range(line_idx, min(line_idx + 5, len(lines))):
-                    if ";" in lines[i]:
-                        for _ in range(i - line_idx + 1):
-                            lines.pop(line_idx)
-                        break
-        return "\n".join(lines)
+            # Handle multi-line declaration (simple search for ;)
+            for i in range(line_idx, min(line_idx + 5, len(lines))):
+                if ";" in lines[i]:
+                    to_remove.update(range(line_idx, i + 1))
+                    break
+        return [line for i, line in enumerate(lines) if i not in to_remove]
 
 
 class GlobalTypeDefinitionRule(BaseRule):
@@ -134,66 +139,39 @@ class GlobalTypeDefinitionRule(BaseRule):
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
         from .variable_rules import VariableOutsideBlockRule
 
         v_rule = VariableOutsideBlockRule()
 
-        # 1. Collect and remove all definitions from bottom to top
-        to_move = []
-        for issue in sorted(issues, key=lambda x: x.line, reverse=True):
+        # 1. Collect the line range of every definition on the original lines
+        content = "\n".join(lines)
+        offsets = line_offsets(lines)
+        to_remove: set[int] = set()
+        to_move: list[str] = []
+        for issue in sorted(issues, key=lambda x: x.line):
             start_line_idx = issue.line - 1
-            if start_line_idx >= len(lines):
+            if start_line_idx >= len(lines) or start_line_idx in to_remove:
                 continue
 
             # Find the end of the definition
-            end_line_idx = None
-            brace_count = 0
-            found_open = False
-            for i in range(start_line_idx, len(lines)):
-                line = lines[i]
-                if "{" in line:
-                    brace_count += line.count("{")
-                    found_open = True
-                if "}" in line:
-                    brace_count -= line.count("}")
-
-                if found_open and brace_count == 0:
-                    end_line_idx = i
-                    break
+            end_pos = find_block_end(content, offsets[start_line_idx])
+            if end_pos != -1:
+                end_line_idx = line_index(offsets, end_pos)
+                to_remove.update(range(start_line_idx, end_line_idx + 1))
+                to_move.extend(line.strip() for line in lines[start_line_idx : end_line_idx + 1])
 
-            if end_line_idx is not None:
-                # Extract the whole block
-                def_lines = lines[start_line_idx : end_line_idx + 1]
-                # Remove from lines
-                for _ in range(len(def_lines)):
-                    lines.pop(start_line_idx)
-
-                to_move.append([line.strip() for line in def_lines])
-
-        # 2. Ensure block exists
-        _, var_block_end = v_rule._find_variables_block_range(lines)
-        if var_block_end is None:
-            insert_pos = 0
-            for i, line in enumerate(lines):
-                if not line.strip().startswith("#include"):
-                    insert_pos = i
-                    break
-            lines.insert(insert_pos, "variables {")
-            lines.insert(insert_pos + 1, "}")
-            var_block_end = insert_pos + 1
+        # 2. Remove all definitions in a single pass
+        lines = [line for i, line in enumerate(lines) if i not in to_remove]
 
-        # 3. Insert all collected definitions
-        for def_lines in reversed(to_move):
-            for def_line in def_lines:
-                lines.insert(var_block_end, "  " + def_line)
-                var_block_end += 1
+        # 3. Ensure block exists and insert all collected definitions
+        var_block_end = v_rule._ensure_variables_block(lines)
+        lines[var_block_end:var_block_end] = ["  " + def_line for def_line in to_move]
 
-        return "\n".join(lines)
+        return lines
 
 
-class ArrowOperatorRule(BaseRule):
+class ArrowOperatorRule(_TreeRule):
     """Detect and fix arrow operator '->' usage (not supported in CAPL)."""
 
     rule_id = "E008"
@@ -203,11 +181,15 @@ class ArrowOperatorRule(BaseRule):
     description = "Arrow operator '->' is not supported in CAPL. Use dot notation instead."
 
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
-        parser = CAPLParser()
-        result = parser.parse_file(file_path)
+        parsed = self._parsed(file_path)
+        source = parsed.source
+        if b"->" not in source:
+            return []
+
+        root = parsed.root
         issues = []
 
-        violations = CAPLPatterns.has_arrow_operator_usage(result.tree.root_node, result.source)
+        violations = CAPLPatterns.has_arrow_operator_usage(root, source)
         for v in violations:
             issues.append(
                 self._create_issue(
@@ -221,16 +203,15 @@ class ArrowOperatorRule(BaseRule):
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
         for issue in sorted(issues, key=lambda x: x.line, reverse=True):
             idx = issue.line - 1
             if idx < len(lines):
                 lines[idx] = lines[idx].replace("->", ".")
-        return "\n".join(lines)
+        return lines
 
 
-class PointerParameterRule(BaseRule):
+class PointerParameterRule(_TreeRule):
     """Detect forbidden struct pointer parameters."""
 
     rule_id = "E009"
@@ -240,13 +221,18 @@ class PointerParameterRule(BaseRule):
     description = "Struct pointers are not supported in CAPL parameters."
 
     def check(self, file_path: Path, db: SymbolDatabase) -> list[InternalIssue]:
-        parser = CAPLParser()
-        result = parser.parse_file(file_path)
+        parsed = self._parsed(file_path)
+        source = parsed.source
+        # A pointer parameter needs a '*' somewhere in the file
+        if b"*" not in source:
+            return []
+
+        root = parsed.root
         issues = []
 
-        funcs = ASTWalker.find_all_by_type(result.tree.root_node, "function_definition")
+        funcs = ASTWalker.find_all_by_type(root, "function_definition")
         for func in funcs:
-            violations = CAPLPatterns.has_forbidden_pointer_parameter(func, result.source)
+            violations = CAPLPatterns.has_forbidden_pointer_parameter(func, source)
             for v in violations:
                 issues.append(
                     self._create_issue(
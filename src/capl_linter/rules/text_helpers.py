@@ -0,0 +1,35 @@
+"""Text helpers shared by rule auto-fixes."""
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+BRACE_PATTERN = re.compile(r"[{}]")
+
+
+def find_block_end(content: str, start: int) -> int:
+    """Return the offset of the '}' closing the first '{' at or after start, or -1.
+
+    Braces are matched by scanning only brace characters with a compiled regex,
+    so the search runs in C (strings/comments are not special-cased).
+    """
+    open_pos = content.find("{", start)
+    if open_pos == -1:
+        return -1
+
+    depth = 0
+    for brace in BRACE_PATTERN.finditer(content, open_pos):
+        depth += 1 if brace.group() == "{" else -1
+        if depth == 0:
+            return brace.start()
+    return -1
+
+
+def line_offsets(lines: list[str]) -> list[int]:
+    """Return the offset of each line's first character in "\\n".join(lines)."""
+    return [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+
+
+def line_index(offsets: list[int], pos: int) -> int:
+    """Map a character offset back to its line index using line_offsets()."""
+    return bisect_right(offsets, pos) - 1
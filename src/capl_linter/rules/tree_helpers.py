@@ -0,0 +1,29 @@
+"""Parse tree sharing for the AST-based rules."""
+
+from pathlib import Path
+
+from tree_sitter import Node, Tree
+
+from capl_tree_sitter import CAPLParser, read_source
+
+
+class ParsedFile:
+    """Source of one file, parsed on first use and shared by every rule of a lint pass."""
+
+    def __init__(self, file_path: Path, parser: CAPLParser, source: bytes | None = None):
+        self.file_path = file_path
+        self.parser = parser
+        self._source = source
+        self._tree: Tree | None = None
+
+    @property
+    def source(self) -> bytes:
+        if self._source is None:
+            self._source = read_source(self.file_path)
+        return self._source
+
+    @property
+    def root(self) -> Node:
+        if self._tree is None:
+            self._tree = self.parser.parse_tree(self.source)
+        return self._tree.root_node
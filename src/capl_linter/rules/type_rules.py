@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from pathlib import Path
 
 from capl_symbol_db.database import SymbolDatabase
@@ -7,6 +8,14 @@ from ..models import InternalIssue, Severity
 from .base import BaseRule
 from .db_helpers import RuleQueryHelper
 
+TYPE_NAME_PATTERN = re.compile(r"Type '(\w+)'")
+
+
+@lru_cache(maxsize=256)
+def _bare_type_pattern(keyword: str, type_name: str) -> re.Pattern[str]:
+    """Compile the pattern matching a use of type_name not preceded by keyword."""
+    return re.compile(rf"(?<!\b{keyword}\s)\b{re.escape(type_name)}\b")
+
 
 class MissingEnumKeywordRule(BaseRule):
     """Detect enum types used without 'enum' keyword."""
@@ -21,33 +30,32 @@ class MissingEnumKeywordRule(BaseRule):
         helper = RuleQueryHelper(db, file_path)
         issues = []
 
-        for var_name, line, context, signature in helper.get_type_usage_errors():
-            if "enum" in context:
-                type_name = signature.split()[0] if signature else "unknown"
-                issues.append(
-                    self._create_issue(
-                        file_path=file_path,
-                        line=line,
-                        message=f"Type '{type_name}' used without 'enum' keyword in declaration of '{var_name}'",
-                        context=context,
-                    )
+        # The helper filters the file's cached symbol rows on the exact context
+        for var_name, line, context, signature in helper.get_type_usage_errors("enum"):
+            type_name = signature.split()[0] if signature else "unknown"
+            issues.append(
+                self._create_issue(
+                    file_path=file_path,
+                    line=line,
+                    message=f"Type '{type_name}' used without 'enum' keyword in declaration of '{var_name}'",
+                    context=context,
                 )
+            )
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
         keyword = "enum" if self.rule_id == "E004" else "struct"
         for issue in sorted(issues, key=lambda x: x.line, reverse=True):
             idx = issue.line - 1
             if idx < len(lines):
                 # Extraction of type name from message is a bit hacky but consistent with old logic
-                match = re.search(r"Type '(\w+)'", issue.message)
+                match = TYPE_NAME_PATTERN.search(issue.message)
                 if match:
                     type_name = match.group(1)
-                    pattern = rf"(?<!\b{keyword}\s)\b{type_name}\b"
-                    lines[idx] = re.sub(pattern, f"{keyword} {type_name}", lines[idx], count=1)
-        return "\n".join(lines)
+                    pattern = _bare_type_pattern(keyword, type_name)
+                    lines[idx] = pattern.sub(f"{keyword} {type_name}", lines[idx], count=1)
+        return lines
 
 
 class MissingStructKeywordRule(BaseRule):
@@ -63,20 +71,19 @@ class MissingStructKeywordRule(BaseRule):
         helper = RuleQueryHelper(db, file_path)
         issues = []
 
-        for var_name, line, context, signature in helper.get_type_usage_errors():
-            if "struct" in context:
-                type_name = signature.split()[0] if signature else "unknown"
-                issues.append(
-                    self._create_issue(
-                        file_path=file_path,
-                        line=line,
-                        message=f"Type '{type_name}' used without 'struct' keyword in declaration of '{var_name}'",
-                        context=context,
-                    )
+        for var_name, line, context, signature in helper.get_type_usage_errors("struct"):
+            type_name = signature.split()[0] if signature else "unknown"
+            issues.append(
+                self._create_issue(
+                    file_path=file_path,
+                    line=line,
+                    message=f"Type '{type_name}' used without 'struct' keyword in declaration of '{var_name}'",
+                    context=context,
                 )
+            )
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
         # Same logic as enum rule
-        return MissingEnumKeywordRule.fix(self, file_path, issues)
+        return MissingEnumKeywordRule.fix_lines(self, lines, issues)
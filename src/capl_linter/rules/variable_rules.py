@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 from capl_symbol_db.database import SymbolDatabase
@@ -5,6 +6,15 @@ from capl_symbol_db.database import SymbolDatabase
 from ..models import InternalIssue, Severity
 from .base import BaseRule
 from .db_helpers import RuleQueryHelper
+from .text_helpers import find_block_end
+
+# Definition header: a return type, "on <event>" or "testcase" prefix, then the
+# name and its '(' or '{', e.g. "void main() {", "testcase TC_1()" or
+# "on message EngineData {". Calls such as "  B();" have no prefix.
+FUNC_HEADER_PATTERN = re.compile(r"^\s*(?:\w+\s+)+(\w+)\s*[({]")
+# Statements the header pattern would otherwise take for a definition ("else if (x) {")
+CONTROL_KEYWORDS = frozenset({"if", "else", "for", "while", "do", "switch", "case", "return"})
+VARIABLES_KEYWORD_PATTERN = re.compile(r"^[ \t]*variables\b", re.MULTILINE)
 
 
 class VariableOutsideBlockRule(BaseRule):
@@ -31,84 +41,48 @@ class VariableOutsideBlockRule(BaseRule):
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
+
+        # 1. Collect all variables to move (in original order)
+        to_remove = {issue.line - 1 for issue in issues if 0 <= issue.line - 1 < len(lines)}
+        to_move = [lines[i].strip() for i in sorted(to_remove)]
+
+        # 2. Remove them in a single pass instead of popping one line at a time
+        lines = [line for i, line in enumerate(lines) if i not in to_remove]
 
-        # 1. Collect all variables to move (with their lines)
-        # Sort by line number descending to avoid index shifting during removal
-        sorted_issues = sorted(issues, key=lambda x: x.line, reverse=True)
-        to_move = []
-        for issue in sorted_issues:
-            line_idx = issue.line - 1
-            if line_idx < len(lines):
-                # Save the content and remove the line
-                to_move.append(lines.pop(line_idx).strip())
+        # 3. Insert all moved variables at the END of the block
+        var_block_end = self._ensure_variables_block(lines)
+        lines[var_block_end:var_block_end] = ["  " + var_content for var_content in to_move]
 
-        # 2. Ensure block exists and find insertion point
+        return lines
+
+    def _ensure_variables_block(self, lines: list[str]) -> int:
+        """Return the index of the closing brace of 'variables {}', creating the block if needed."""
         var_block_start, var_block_end = self._find_variables_block_range(lines)
-        if var_block_start is None:
+        if var_block_start is None or var_block_end is None:
             # Create block
             insert_pos = 0
             for i, line in enumerate(lines):
                 if not line.strip().startswith("#include"):
                     insert_pos = i
                     break
-            lines.insert(insert_pos, "variables {")
-            lines.insert(insert_pos + 1, "}")
+            lines[insert_pos:insert_pos] = ["variables {", "}"]
             var_block_end = insert_pos + 1
+        return var_block_end
 
-        # 3. Insert all moved variables into the block
-        # Use reversed(to_move) because we collected them bottom-up (reverse=True)
-        # but we want to insert them at the END of the block in original order.
-        for var_content in reversed(to_move):
-            lines.insert(var_block_end, "  " + var_content)
-            var_block_end += 1
-
-        return "\n".join(lines)
-
-    def _find_variables_block_range(self, lines: list[str]):
-        start_idx = None
-        open_brace_idx = None
-
-        # 1. Find "variables" keyword
-        for i, line in enumerate(lines):
-            # Ignore comments (simple check)
-            clean_line = line.split("//")[0].strip()
-            if "variables" == clean_line:
-                start_idx = i
-                break
-            # Handle "variables {" on same line
-            if clean_line.startswith("variables") and "{" in clean_line:
-                start_idx = i
-                open_brace_idx = i
-                break
-
-        if start_idx is None:
+    def _find_variables_block_range(self, lines: list[str]) -> tuple[int | None, int | None]:
+        # Search the joined text so keyword and brace scanning run in C
+        content = "\n".join(lines)
+        match = VARIABLES_KEYWORD_PATTERN.search(content)
+        if match is None:
             return None, None
 
-        # 2. Find opening brace if not found yet
-        if open_brace_idx is None:
-            for i in range(start_idx, len(lines)):
-                if "{" in lines[i]:
-                    open_brace_idx = i
-                    break
-
-        if open_brace_idx is None:
+        end_pos = find_block_end(content, match.end())
+        if end_pos == -1:
             return None, None
 
-        # 3. Find closing brace
-        brace_count = 0
-        for i in range(open_brace_idx, len(lines)):
-            line = lines[i]
-            # Simple brace counting (ignoring strings/comments for now as linter runs on text)
-            # A more robust approach would use AST, but this is a text-based fix.
-            brace_count += line.count("{")
-            brace_count -= line.count("}")
-
-            if brace_count == 0:
-                return start_idx, i
-
-        return None, None
+        start_idx = content.count("\n", 0, match.start())
+        return start_idx, start_idx + content.count("\n", match.start(), end_pos)
 
 
 class MidBlockVariableRule(BaseRule):
@@ -136,8 +110,7 @@ class MidBlockVariableRule(BaseRule):
 
         return issues
 
-    def fix(self, file_path: Path, issues: list[InternalIssue]) -> str:
-        lines = file_path.read_text(encoding="utf-8").split("\n")
+    def fix_lines(self, lines: list[str], issues: list[InternalIssue]) -> list[str]:
 
         # Group issues by parent function/testcase
         by_parent: dict[str, list[InternalIssue]] = {}
@@ -147,8 +120,17 @@ class MidBlockVariableRule(BaseRule):
                 by_parent[parent] = []
             by_parent[parent].append(issue)
 
+        # Index header lines once; lines are only edited in the rebuild below
+        func_starts = self._index_function_starts(lines)
+        to_remove: set[int] = set()
+        inserts: dict[int, list[str]] = {}
+
         for parent_name, parent_issues in by_parent.items():
-            func_start_idx = self._find_function_start(lines, parent_name)
+            if parent_name == "unknown":
+                continue
+            func_start_idx = func_starts.get(parent_name)
+            if func_start_idx is None:
+                func_start_idx = self._find_function_start(lines, parent_name)
             if func_start_idx is None:
                 continue
 
@@ -161,19 +143,37 @@ class MidBlockVariableRule(BaseRule):
             if body_start_idx is None:
                 continue
 
-            # Extract and remove variable lines
-            to_move_lines = []
+            # Moved lines land at the body start in descending source order
             for issue in sorted(parent_issues, key=lambda x: x.line, reverse=True):
                 line_idx = issue.line - 1
-                if line_idx >= len(lines):
+                if line_idx >= len(lines) or line_idx in to_remove:
                     continue
-                to_move_lines.append(lines.pop(line_idx).strip())
+                to_remove.add(line_idx)
+                inserts.setdefault(body_start_idx, []).append("  " + lines[line_idx].strip())
 
-            # Insert at body start
-            for var_line in reversed(to_move_lines):
-                lines.insert(body_start_idx, "  " + var_line)
+        # Rebuild once instead of popping/inserting per variable
+        out = []
+        for i, line in enumerate(lines):
+            if i in inserts:
+                out.extend(inserts[i])
+            if i not in to_remove:
+                out.append(line)
+        if len(lines) in inserts:
+            out.extend(inserts[len(lines)])
+
+        return out
 
-        return "\n".join(lines)
+    def _index_function_starts(self, lines: list[str]) -> dict[str, int]:
+        func_starts: dict[str, int] = {}
+        for i, line in enumerate(lines):
+            match = FUNC_HEADER_PATTERN.match(line)
+            if match is None or match.group(1) in CONTROL_KEYWORDS:
+                continue
+            # A ';' before any body marks a prototype or a statement
+            if ";" in line[match.end() :].split("{", 1)[0]:
+                continue
+            func_starts.setdefault(match.group(1), i)
+        return func_starts
 
     def _find_function_start(self, lines: list[str], func_name: str) -> int | None:
         if not func_name or func_name == "unknown":
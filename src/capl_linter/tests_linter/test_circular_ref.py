@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 
 from capl_linter.rules.semantic_rules import CircularIncludeRule
@@ -35,5 +37,132 @@ def test_circular_dependency_detection(tmp_path):
     assert "CircularB.can" in issues[0].message
 
 
+def test_circular_dependency_detection_parallel(tmp_path):
+    file_a = tmp_path / "CircularA.can"
+    file_b = tmp_path / "CircularB.can"
+    file_a.write_text('#include "CircularB.can"\nvariables { int g_a; }', encoding="utf-8")
+    file_b.write_text('#include "CircularA.can"\nvariables { int g_b; }', encoding="utf-8")
+
+    db = SymbolDatabase(str(tmp_path / "test_circular.db"))
+    DependencyAnalyzer(db, strict=True).analyze_files([file_a, file_b], max_workers=2)
+
+    issues = CircularIncludeRule().check(file_a, db)
+    assert len(issues) > 0
+    assert issues[0].rule_id == "W001"
+
+
+def test_dependency_analysis_reuses_cached_includes(tmp_path, monkeypatch):
+    file_a = tmp_path / "CircularA.can"
+    file_b = tmp_path / "CircularB.can"
+    file_a.write_text('#include "CircularB.can"\nvariables { int g_a; }', encoding="utf-8")
+    file_b.write_text("variables { int g_b; }", encoding="utf-8")
+
+    db = SymbolDatabase(str(tmp_path / "test_circular.db"))
+    DependencyAnalyzer(db, strict=True).analyze_file(file_a)
+
+    # A fresh analyzer finds the unchanged file in the persistent cache
+    analyzer = DependencyAnalyzer(db, strict=True)
+    extracted: list[bytes] = []
+    monkeypatch.setattr(analyzer, "_extract_includes", extracted.append)
+    analyzer.analyze_file(file_a)
+    assert extracted == []
+
+    rows = db.conn.execute("SELECT include_path, is_resolved FROM includes").fetchall()
+    assert rows == [("CircularB.can", 1)]
+
+
+def test_dependency_batch_size_does_not_change_storage(tmp_path):
+    file_a = tmp_path / "a.can"
+    file_b = tmp_path / "b.can"
+    file_a.write_text('#include "b.can"\n', encoding="utf-8")
+    file_b.write_text("variables { int x; }\n", encoding="utf-8")
+
+    single = SymbolDatabase(str(tmp_path / "single.db"))
+    DependencyAnalyzer(single).analyze_files([file_a])
+    batch = SymbolDatabase(str(tmp_path / "batch.db"))
+    DependencyAnalyzer(batch).analyze_files([file_a, file_b])
+
+    # Neither path stores a content hash, so the linter still extracts symbols
+    assert single.get_file_hash(file_a) is None
+    assert batch.get_file_hash(file_a) is None
+
+
+def test_circular_dependency_repeated_include_reported_once(tmp_path):
+    (tmp_path / "a.can").write_text('#include "b.cin"\n#include "b.cin"\n')
+    (tmp_path / "b.cin").write_text('#include "a.can"\n')
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    analyzer = DependencyAnalyzer(db)
+    analyzer.analyze_file(tmp_path / "a.can")
+    analyzer.analyze_file(tmp_path / "b.cin")
+
+    assert len(db.detect_circular_includes(tmp_path / "a.can")) == 1
+
+
+def test_circular_dependency_sees_includes_added_later(tmp_path):
+    (tmp_path / "a.can").write_text('#include "b.cin"\n')
+    (tmp_path / "b.cin").write_text("")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    analyzer = DependencyAnalyzer(db)
+    analyzer.analyze_file(tmp_path / "a.can")
+    analyzer.analyze_file(tmp_path / "b.cin")
+    assert db.detect_circular_includes(tmp_path / "a.can") == []
+
+    (tmp_path / "b.cin").write_text('#include "a.can"\n')
+    analyzer.analyze_file(tmp_path / "b.cin")
+    assert len(db.detect_circular_includes(tmp_path / "a.can")) == 1
+
+
+def test_circular_dependency_reached_through_acyclic_include(tmp_path):
+    (tmp_path / "main.can").write_text('#include "b.cin"\n')
+    (tmp_path / "b.cin").write_text('#include "c.cin"\n')
+    (tmp_path / "c.cin").write_text('#include "b.cin"\n')
+    (tmp_path / "other.can").write_text('#include "c.cin"\n')
+    (tmp_path / "plain.can").write_text("")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    analyzer = DependencyAnalyzer(db)
+    for name in ("main.can", "b.cin", "c.cin", "other.can", "plain.can"):
+        analyzer.analyze_file(tmp_path / name)
+
+    cycles = db.detect_circular_includes(tmp_path / "main.can")
+    assert [[Path(p).name for p in cycle] for cycle in cycles] == [["b.cin", "c.cin", "b.cin"]]
+    assert len(db.detect_circular_includes(tmp_path / "other.can")) == 1
+    assert db.detect_circular_includes(tmp_path / "plain.can") == []
+
+
+def test_dependency_include_after_non_ascii_text(tmp_path):
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    source = '// Überprüfung\n#include "Common.cin"\n'.encode()
+    assert DependencyAnalyzer(db, strict=True)._extract_includes(source) == [("Common.cin", 2)]
+
+
+def test_dependency_include_prefix_keeps_open_comment(tmp_path):
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    source = b'#include "A.cin"\n/* #include "B.cin"\n*/\nvariables { int x; }\n'
+    assert DependencyAnalyzer(db, strict=True)._extract_includes(source) == [("A.cin", 1)]
+
+
+def test_dependency_spaced_include_directive(tmp_path):
+    file_a = tmp_path / "a.can"
+    file_a.write_text('# include "b.cin"\nvariables { int x; }\n', encoding="utf-8")
+    (tmp_path / "b.cin").write_text("variables { int y; }\n", encoding="utf-8")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    file_id = DependencyAnalyzer(db).analyze_file(file_a)
+    rows = db.conn.execute(
+        "SELECT include_path, is_resolved FROM includes WHERE source_file_id = ?", (file_id,)
+    ).fetchall()
+    assert rows == [("b.cin", 1)]
+
+
+def test_dependency_include_prefix_ends_after_spaced_directive(tmp_path):
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    source = b'#include "A.cin"\n#  include "B.cin"\nvariables { int x; }\n'
+    includes = DependencyAnalyzer(db, strict=True)._extract_includes(source)
+    assert includes == [("A.cin", 1), ("B.cin", 2)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,4 +1,6 @@
 from capl_linter.engine import LinterEngine
+from capl_linter.rules.semantic_rules import DuplicateFunctionRule, UndefinedSymbolRule
+from capl_linter.rules.syntax_rules import ArrowOperatorRule, PointerParameterRule
 from capl_symbol_db.database import SymbolDatabase
 from capl_symbol_db.extractor import SymbolExtractor
 
@@ -28,3 +30,118 @@ def test_linter_forbidden_syntax(tmp_path):
     assert len(issues) == 2
     assert any(i.rule_id == "E001" for i in issues)
     assert any(i.rule_id == "E006" for i in issues)
+
+
+def test_linter_duplicate_function_across_files(tmp_path):
+    db_path = tmp_path / "test.db"
+    engine = LinterEngine(str(db_path))
+
+    file_a = tmp_path / "A.can"
+    file_b = tmp_path / "B.can"
+    file_a.write_text("void Shared(int x) {}\nvoid OnlyA() {}\n")
+    file_b.write_text("void Shared(int y) {}\nvoid Shared() {}\n")
+    engine.analyze_project(tmp_path)
+
+    issues = engine.analyze_file(file_a, rules=[DuplicateFunctionRule()])
+
+    assert len(issues) == 1
+    assert issues[0].line == 1
+    assert "'Shared'" in issues[0].message
+    assert "B.can:1" in issues[0].message
+
+
+def test_linter_undefined_symbol_sees_header_changes(tmp_path):
+    engine = LinterEngine(str(tmp_path / "test.db"))
+
+    main = tmp_path / "main.can"
+    header = tmp_path / "lib.cin"
+    main.write_text('includes {\n  #include "lib.cin"\n}\nvoid Run() {\n  Helper();\n}\n')
+    header.write_text("void Other() {}\n")
+    engine.analyze_project(tmp_path)
+
+    issues = engine.analyze_file(main, rules=[UndefinedSymbolRule()])
+    assert "Undefined symbol 'Helper'" in [i.message for i in issues]
+
+    header.write_text("void Other() {}\nvoid Helper() {}\n")
+    engine.analyze_file(header)
+
+    issues = engine.analyze_file(main, rules=[UndefinedSymbolRule()])
+    assert "Undefined symbol 'Helper'" not in [i.message for i in issues]
+
+
+def test_linter_duplicate_function_project_pass(tmp_path):
+    engine = LinterEngine(str(tmp_path / "test.db"))
+
+    (tmp_path / "A.can").write_text("void Shared() {}\n")
+    (tmp_path / "B.can").write_text("void Shared() {}\n")
+    (tmp_path / "C.can").write_text("void OnlyC() {}\n")
+    engine.analyze_project(tmp_path)
+
+    # Every file is checked against the project-wide duplicate names
+    rule = DuplicateFunctionRule()
+    counts = {
+        name: len(engine.analyze_file(tmp_path / name, rules=[rule]))
+        for name in ("C.can", "A.can", "B.can")
+    }
+    assert counts == {"C.can": 0, "A.can": 1, "B.can": 1}
+    assert rule.duplicate_names == {"Shared"}
+
+    # Storing a file again invalidates the project pass
+    (tmp_path / "C.can").write_text("void Shared() {}\n")
+    assert len(engine.analyze_file(tmp_path / "C.can", rules=[rule])) == 1
+    assert rule.duplicate_names is None
+
+
+def test_linter_project_scan_reads_each_file_once(tmp_path, monkeypatch):
+    import capl_symbol_db.dependency
+
+    engine = LinterEngine(str(tmp_path / "test.db"))
+    (tmp_path / "A.can").write_text('#include "B.cin"\nvoid A() {}\n')
+    (tmp_path / "B.cin").write_text("void B() {}\n")
+
+    def unexpected_read(path):
+        raise AssertionError(f"{path} read again")
+
+    # The include analysis gets the bytes the change check already read
+    monkeypatch.setattr(capl_symbol_db.dependency, "read_source", unexpected_read)
+    assert engine.analyze_project(tmp_path) == 2
+    rows = engine.db.conn.execute("SELECT include_path, is_resolved FROM includes").fetchall()
+    assert rows == [("B.cin", 1)]
+
+
+def test_linter_custom_builtins_set_built_once(tmp_path):
+    engine = LinterEngine(str(tmp_path / "test.db"), custom_builtins=["PanelSet"])
+    rule = UndefinedSymbolRule()
+
+    file_a = tmp_path / "a.can"
+    file_b = tmp_path / "b.can"
+    file_a.write_text("void A() {\n  PanelSet();\n}\n")
+    file_b.write_text("void B() {\n  PanelSet();\n}\n")
+
+    assert engine.analyze_file(file_a, rules=[rule]) == []
+    names = rule._builtin_names
+    assert engine.analyze_file(file_b, rules=[rule]) == []
+    assert rule._builtin_names is names
+
+
+def test_linter_ast_rules_share_one_parse_per_file(tmp_path, monkeypatch):
+    engine = LinterEngine(str(tmp_path / "test.db"))
+    arrow_rule = ArrowOperatorRule()
+    pointer_rule = PointerParameterRule()
+    file_path = tmp_path / "ptr.can"
+    file_path.write_text("void F(struct Data* p) {\n  p->id = 1;\n}\n")
+    engine.analyze_file(file_path)
+
+    parsed: list[bytes] = []
+    parse_tree = engine.parser.parse_tree
+
+    def recording_parse_tree(source):
+        parsed.append(source)
+        return parse_tree(source)
+
+    monkeypatch.setattr(engine.parser, "parse_tree", recording_parse_tree)
+    issues = engine.analyze_file(file_path, rules=[arrow_rule, pointer_rule])
+
+    assert {i.rule_id for i in issues} == {"E008", "E009"}
+    assert len(parsed) == 1
+    assert arrow_rule.parsed_file is None and pointer_rule.parsed_file is None
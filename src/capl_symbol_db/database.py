@@ -1,340 +1,764 @@
 import hashlib
 import sqlite3
+from collections.abc import Iterator
 from pathlib import Path
+from typing import TypeVar
 
 from .models import SymbolInfo
 
 
+def _tune_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply per-connection performance PRAGMAs.
+
+    journal_mode=WAL is persistent and is set once in _init_db; the settings
+    below only live as long as the connection and must be applied on open.
+    """
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+# Files visible from the file bound to the parameter: itself plus everything
+# it includes, transitively
+_VISIBLE_FILES_CTE = """
+    WITH RECURSIVE visible_files(id) AS (
+        SELECT file_id FROM files WHERE file_path = ?
+
+        UNION
+
+        SELECT i.included_file_id
+        FROM includes i
+        JOIN visible_files vf ON i.source_file_id = vf.id
+        WHERE i.included_file_id IS NOT NULL
+    )
+"""
+
+# Default SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds
+_MAX_PARAMS = 999
+
+T = TypeVar("T")
+
+# Prepared statements kept per connection. The default of 128 is easily
+# churned by the variable-length IN (...) and multi-row VALUES statements,
+# which would evict the fixed per-file statements between files.
+_CACHED_STATEMENTS = 512
+
+
+def param_chunks(values: list[T]) -> Iterator[list[T]]:
+    """Split values into chunks that fit SQLite's host parameter limit"""
+    for i in range(0, len(values), _MAX_PARAMS):
+        yield values[i : i + _MAX_PARAMS]
+
+
+def insert_rows(
+    conn: sqlite3.Connection, table: str, columns: tuple[str, ...], rows: list[tuple]
+) -> None:
+    """Insert rows using chunked multi-row VALUES statements.
+
+    One statement carries as many rows as the parameter limit allows, which
+    cuts per-statement dispatch compared to executemany on large batches.
+    Small batches go through executemany.
+    """
+    row_sql = "(" + ",".join("?" * len(columns)) + ")"
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    chunk_size = max(1, _MAX_PARAMS // len(columns))
+    if len(rows) < chunk_size:
+        conn.executemany(prefix + row_sql, rows)
+        return
+
+    full_sql = prefix + ",".join([row_sql] * chunk_size)
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i : i + chunk_size]
+        sql = full_sql if len(chunk) == chunk_size else prefix + ",".join([row_sql] * len(chunk))
+        conn.execute(sql, [value for row in chunk for value in row])
+
+
 class SymbolDatabase:
     """Manages SQLite database for CAPL symbols and files"""
 
     def __init__(self, db_path: str = "aic.db"):
         self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._resolved: dict[Path, str] = {}
+        # resolved path -> file_id; rows in `files` are never deleted
+        self._file_ids: dict[str, int] = {}
+        # (change stamp, adjacency) of the include graph last loaded
+        self._include_graph: tuple[tuple[int, int], dict[int, dict[int, None]]] | None = None
+        # (include graph it was computed from, ids of files that can reach a cycle)
+        self._cycle_reach: tuple[dict[int, dict[int, None]], set[int]] | None = None
+        # Per-file read caches, valid while the change stamp matches:
+        # file id -> symbol rows, file id -> names visible to includers
+        self._symbol_rows: dict[int, list[tuple]] = {}
+        self._symbol_names: dict[int, set[str]] = {}
+        self._cache_stamp: tuple[int, int] | None = None
         self._init_db()
 
+    def resolve_path(self, file_path: Path) -> str:
+        """Return the absolute path string stored in the DB (resolved once per path)"""
+        file_path_abs = self._resolved.get(file_path)
+        if file_path_abs is None:
+            file_path_abs = str(Path(file_path).resolve())
+            self._resolved[file_path] = file_path_abs
+        return file_path_abs
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new connection to the database with tuned PRAGMAs"""
+        return _tune_connection(sqlite3.connect(self.db_path, cached_statements=_CACHED_STATEMENTS))
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Long-lived connection shared by all operations on this database"""
+        if self._conn is None:
+            self._conn = self.connect()
+        return self._conn
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """Shared read-only connection for query-only paths such as lint rules"""
+        if self._reader is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            # Autocommit: the reader never writes, so it has no use for the
+            # module's implicit transaction handling
+            self._reader = _tune_connection(
+                sqlite3.connect(
+                    uri,
+                    uri=True,
+                    isolation_level=None,
+                    cached_statements=_CACHED_STATEMENTS,
+                )
+            )
+        return self._reader
+
+    def close(self):
+        """Close the shared connections (they are reopened lazily on next use)"""
+        # The reader goes first so the writer is the last connection and can
+        # checkpoint and remove the WAL file on close
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._conn is not None:
+            # Refresh planner statistics for tables that changed a lot in this
+            # session; a no-op when nothing needs it
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+            self._conn = None
+        self._include_graph = None
+        self._cycle_reach = None
+        self._cache_stamp = None
+
+    def __enter__(self) -> "SymbolDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _init_db(self):
         """Initialize database schema"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS files (
-                        file_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_path TEXT UNIQUE NOT NULL,
-                        last_parsed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        parse_success BOOLEAN,
-                        file_hash TEXT
-                    )
-                """)
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS symbols (
-                        symbol_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_id INTEGER NOT NULL,
-                        symbol_name TEXT NOT NULL,
-                        symbol_type TEXT,
-                        line_number INTEGER,
-                        signature TEXT,
-                        scope TEXT,
-                        declaration_position TEXT,
-                        parent_symbol TEXT,
-                        context TEXT,
-                        param_count INTEGER,
-                        has_body BOOLEAN,
-                        FOREIGN KEY (file_id) REFERENCES files(file_id)
-                    )
-                """)
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS includes (
-                        include_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        source_file_id INTEGER NOT NULL,
-                        included_file_id INTEGER,
-                        include_path TEXT NOT NULL,
-                        line_number INTEGER,
-                        is_resolved BOOLEAN,
-                        FOREIGN KEY (source_file_id) REFERENCES files(file_id),
-                        FOREIGN KEY (included_file_id) REFERENCES files(file_id)
-                    )
-                """)
-
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS type_definitions (
-                        type_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_id INTEGER NOT NULL,
-                        type_name TEXT NOT NULL,
-                        type_kind TEXT NOT NULL,
-                        line_number INTEGER,
-                        members TEXT,
-                        scope TEXT,
-                        FOREIGN KEY (file_id) REFERENCES files(file_id)
-                    )
-                """)
-
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS symbol_references (
-                        ref_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_id INTEGER NOT NULL,
-                        symbol_name TEXT NOT NULL,
-                        line_number INTEGER,
-                        column_number INTEGER,
-                        reference_type TEXT,
-                        context TEXT,
-                        FOREIGN KEY (file_id) REFERENCES files(file_id)
-                    )
-                """)
-
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS message_usage (
-                        usage_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_id INTEGER NOT NULL,
-                        message_name TEXT NOT NULL,
-                        usage_type TEXT,
-                        line_number INTEGER,
-                        FOREIGN KEY (file_id) REFERENCES files(file_id)
-                    )
-                """)
-
-                # Indexes
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_files_path ON files(file_path)")
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id)")
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(symbol_name)")
-                conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_includes_source ON includes(source_file_id)"
+        conn = self.conn
+        # WAL lets readers and the writer proceed concurrently and, together
+        # with synchronous=NORMAL, avoids an fsync on every commit.
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT UNIQUE NOT NULL,
+                    last_parsed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    parse_success BOOLEAN,
+                    file_hash TEXT
                 )
-                conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_includes_target ON includes(included_file_id)"
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbols (
+                    symbol_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_id INTEGER NOT NULL,
+                    symbol_name TEXT NOT NULL,
+                    symbol_type TEXT,
+                    line_number INTEGER,
+                    signature TEXT,
+                    scope TEXT,
+                    declaration_position TEXT,
+                    parent_symbol TEXT,
+                    context TEXT,
+                    param_count INTEGER,
+                    has_body BOOLEAN,
+                    FOREIGN KEY (file_id) REFERENCES files(file_id)
                 )
-                conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_types_name ON type_definitions(type_name)"
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS includes (
+                    include_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source_file_id INTEGER NOT NULL,
+                    included_file_id INTEGER,
+                    include_path TEXT NOT NULL,
+                    line_number INTEGER,
+                    is_resolved BOOLEAN,
+                    FOREIGN KEY (source_file_id) REFERENCES files(file_id),
+                    FOREIGN KEY (included_file_id) REFERENCES files(file_id)
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS type_definitions (
+                    type_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_id INTEGER NOT NULL,
+                    type_name TEXT NOT NULL,
+                    type_kind TEXT NOT NULL,
+                    line_number INTEGER,
+                    members TEXT,
+                    scope TEXT,
+                    FOREIGN KEY (file_id) REFERENCES files(file_id)
+                )
+            """)
+
+            # Keyed by position so rows cluster per file: no rowid, no
+            # AUTOINCREMENT bookkeeping and no separate file_id index.
+            # CREATE IF NOT EXISTS keeps an older ref_id table as it is, so
+            # that one is dropped; references are re-derived from the sources,
+            # and clearing the stored hashes makes every file count as changed
+            columns = conn.execute("PRAGMA table_info(symbol_references)").fetchall()
+            if any(column[1] == "ref_id" for column in columns):
+                conn.execute("DROP TABLE symbol_references")
+                conn.execute("UPDATE files SET file_hash = NULL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbol_references (
+                    file_id INTEGER NOT NULL,
+                    line_number INTEGER NOT NULL,
+                    column_number INTEGER NOT NULL,
+                    symbol_name TEXT NOT NULL,
+                    reference_type TEXT NOT NULL,
+                    context TEXT,
+                    PRIMARY KEY (file_id, line_number, column_number, symbol_name),
+                    FOREIGN KEY (file_id) REFERENCES files(file_id)
+                ) WITHOUT ROWID
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS message_usage (
+                    usage_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_id INTEGER NOT NULL,
+                    message_name TEXT NOT NULL,
+                    usage_type TEXT,
+                    line_number INTEGER,
+                    FOREIGN KEY (file_id) REFERENCES files(file_id)
+                )
+            """)
+
+            # Includes extracted per file content, so unchanged files skip parsing
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS include_cache (
+                    file_path TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    includes_json TEXT NOT NULL
                 )
-        finally:
-            conn.close()
+            """)
+
+            # Indexes
+            # Indexes nothing queries still cost a write on every insert:
+            # files(file_path) duplicates the UNIQUE constraint's own index,
+            # no query filters includes on included_file_id, and
+            # type_definitions is never written or read
+            for index in ("idx_files_path", "idx_includes_target", "idx_types_name"):
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+            # Lint rules look up a file's symbols of one type, and E012 matches
+            # functions by name and parameter count; the composite indexes
+            # answer both without filtering rows, and supersede the former
+            # single-column ones
+            conn.execute("DROP INDEX IF EXISTS idx_symbols_file")
+            conn.execute("DROP INDEX IF EXISTS idx_symbols_name")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_symbols_file_type ON symbols(file_id, symbol_type)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_symbols_name_type "
+                "ON symbols(symbol_name, symbol_type, param_count)"
+            )
+            # Covers the include-graph walks, which read only the edge columns;
+            # it also serves lookups by source_file_id alone
+            conn.execute("DROP INDEX IF EXISTS idx_includes_source")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_includes_edges "
+                "ON includes(source_file_id, included_file_id)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_msg_file ON message_usage(file_id)")
 
     def store_file(self, file_path: Path, source_code: bytes) -> int:
         """Store file info and return its ID"""
-        file_path_abs = str(file_path.resolve())
+        file_path_abs = self.resolve_path(file_path)
         file_hash = hashlib.md5(source_code).hexdigest()
 
-        conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
+        conn = self.conn
+        with conn:
+            # Known files only need their row refreshed, not an upsert
+            file_id = self._file_ids.get(file_path_abs)
+            if file_id is not None:
                 cursor = conn.execute(
                     """
-                    INSERT INTO files (file_path, parse_success, file_hash)
-                    VALUES (?, 1, ?)
-                    ON CONFLICT(file_path) DO UPDATE SET 
-                        last_parsed = CURRENT_TIMESTAMP,
-                        file_hash = excluded.file_hash
-                    RETURNING file_id
-                """,
-                    (file_path_abs, file_hash),
+                    UPDATE files SET last_parsed = CURRENT_TIMESTAMP, file_hash = ?
+                    WHERE file_id = ?
+                    """,
+                    (file_hash, file_id),
                 )
-                return cursor.fetchone()[0]
-        finally:
-            conn.close()
+                if cursor.rowcount:
+                    return file_id
+
+            cursor = conn.execute(
+                """
+                INSERT INTO files (file_path, parse_success, file_hash)
+                VALUES (?, 1, ?)
+                ON CONFLICT(file_path) DO UPDATE SET 
+                    last_parsed = CURRENT_TIMESTAMP,
+                    file_hash = excluded.file_hash
+                RETURNING file_id
+            """,
+                (file_path_abs, file_hash),
+            )
+            file_id = cursor.fetchone()[0]
+        self._file_ids[file_path_abs] = file_id
+        return file_id
 
     def get_or_create_file_id(self, file_path: Path) -> int:
         """Get ID for a file, creating a placeholder entry if needed"""
-        file_path_abs = str(file_path.resolve())
-        conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
-                # Try insert with NULL hash
-                # We use parse_success=0 as it's not parsed yet
-                try:
-                    cursor = conn.execute(
-                        """
-                        INSERT INTO files (file_path, parse_success, file_hash)
-                        VALUES (?, 0, NULL)
-                        RETURNING file_id
-                        """,
-                        (file_path_abs,),
-                    )
-                    return cursor.fetchone()[0]
-                except sqlite3.IntegrityError:
-                    # Already exists
-                    cursor = conn.execute(
-                        "SELECT file_id FROM files WHERE file_path = ?", (file_path_abs,)
-                    )
-                    return cursor.fetchone()[0]
-        finally:
-            conn.close()
+        file_path_abs = self.resolve_path(file_path)
+        file_id = self._file_ids.get(file_path_abs)
+        if file_id is not None:
+            return file_id
+
+        conn = self.conn
+        with conn:
+            # Try insert with NULL hash
+            # We use parse_success=0 as it's not parsed yet
+            try:
+                cursor = conn.execute(
+                    """
+                    INSERT INTO files (file_path, parse_success, file_hash)
+                    VALUES (?, 0, NULL)
+                    RETURNING file_id
+                    """,
+                    (file_path_abs,),
+                )
+                file_id = cursor.fetchone()[0]
+            except sqlite3.IntegrityError:
+                # Already exists
+                cursor = conn.execute(
+                    "SELECT file_id FROM files WHERE file_path = ?", (file_path_abs,)
+                )
+                file_id = cursor.fetchone()[0]
+        self._file_ids[file_path_abs] = file_id
+        return file_id
+
+    def register_files(self, file_paths: list[Path]) -> dict[str, int]:
+        """Get IDs for many files at once, creating placeholder entries as needed.
+
+        Returns a mapping of resolved path string to file_id.
+        """
+        file_ids = {}
+        paths_abs = []
+        # Ids already known to this instance need no round-trip; only the
+        # remaining paths are inserted and looked up
+        for path_abs in dict.fromkeys(self.resolve_path(p) for p in file_paths):
+            file_id = self._file_ids.get(path_abs)
+            if file_id is None:
+                paths_abs.append(path_abs)
+            else:
+                file_ids[path_abs] = file_id
+        if not paths_abs:
+            return file_ids
+
+        conn = self.conn
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO files (file_path, parse_success, file_hash)
+                VALUES (?, 0, NULL)
+                """,
+                [(p,) for p in paths_abs],
+            )
+            for chunk in param_chunks(paths_abs):
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT file_path, file_id FROM files WHERE file_path IN ({placeholders})",
+                    chunk,
+                )
+                for file_path, file_id in cursor:
+                    self._file_ids[file_path] = file_ids[file_path] = file_id
+        return file_ids
 
     def store_symbols(self, file_id: int, symbols: list[SymbolInfo]):
         """Store symbols for a specific file"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
-                conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
-                for sym in symbols:
-                    conn.execute(
-                        """
-                        INSERT INTO symbols (file_id, symbol_name, symbol_type, line_number, 
-                                          signature, scope, declaration_position, parent_symbol, 
-                                          context, param_count, has_body)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            file_id,
-                            sym.name,
-                            sym.symbol_type,
-                            sym.line_number,
-                            sym.signature,
-                            sym.scope,
-                            sym.declaration_position,
-                            sym.parent_symbol,
-                            sym.context,
-                            sym.param_count,
-                            sym.has_body,
-                        ),
+        conn = self.conn
+        with conn:
+            conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+            insert_rows(
+                conn,
+                "symbols",
+                (
+                    "file_id",
+                    "symbol_name",
+                    "symbol_type",
+                    "line_number",
+                    "signature",
+                    "scope",
+                    "declaration_position",
+                    "parent_symbol",
+                    "context",
+                    "param_count",
+                    "has_body",
+                ),
+                [
+                    (
+                        file_id,
+                        sym.name,
+                        sym.symbol_type,
+                        sym.line_number,
+                        sym.signature,
+                        sym.scope,
+                        sym.declaration_position,
+                        sym.parent_symbol,
+                        sym.context,
+                        sym.param_count,
+                        sym.has_body,
                     )
-        finally:
-            conn.close()
+                    for sym in symbols
+                ],
+            )
 
     def clear_file_data(self, file_path: Path):
         """Remove all data related to a specific file (symbols, types, etc.)"""
-        file_path_abs = str(file_path.resolve())
-        conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
-                # Find file_id first
+        file_path_abs = self.resolve_path(file_path)
+        conn = self.conn
+        with conn:
+            # Find file_id first (known files skip the lookup)
+            file_id = self._file_ids.get(file_path_abs)
+            if file_id is None:
                 cursor = conn.execute(
                     "SELECT file_id FROM files WHERE file_path = ?", (file_path_abs,)
                 )
                 res = cursor.fetchone()
-                if res:
-                    file_id = res[0]
-                    conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
-                    conn.execute("DELETE FROM type_definitions WHERE file_id = ?", (file_id,))
-                    conn.execute("DELETE FROM symbol_references WHERE file_id = ?", (file_id,))
-                    conn.execute("DELETE FROM message_usage WHERE file_id = ?", (file_id,))
-                    # We don't delete the file entry itself, just its facts
-        finally:
-            conn.close()
+                file_id = res[0] if res else None
+            if file_id is not None:
+                conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+                conn.execute("DELETE FROM type_definitions WHERE file_id = ?", (file_id,))
+                conn.execute("DELETE FROM symbol_references WHERE file_id = ?", (file_id,))
+                conn.execute("DELETE FROM message_usage WHERE file_id = ?", (file_id,))
+                # We don't delete the file entry itself, just its facts
+
+    def _change_stamp(self) -> tuple[int, int]:
+        """Value that changes whenever the database content may have changed
+
+        total_changes counts this connection's writes and data_version moves
+        when another connection commits.
+        """
+        conn = self.conn
+        return conn.total_changes, conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_caches(self):
+        """Drop the per-file read caches if the database changed since they were filled"""
+        stamp = self._change_stamp()
+        if stamp != self._cache_stamp:
+            self._symbol_rows = {}
+            self._symbol_names = {}
+            self._cache_stamp = stamp
+
+    def get_file_id(self, file_path: Path) -> int | None:
+        """Return the ID of a stored file, or None if it is not in the DB"""
+        file_path_abs = self.resolve_path(file_path)
+        file_id = self._file_ids.get(file_path_abs)
+        if file_id is None:
+            row = self.conn.execute(
+                "SELECT file_id FROM files WHERE file_path = ?", (file_path_abs,)
+            ).fetchone()
+            if row is not None:
+                file_id = self._file_ids[file_path_abs] = row[0]
+        return file_id
+
+    def get_file_symbols(self, file_path: Path) -> list[tuple]:
+        """Get all symbols of one file, in the order they were stored
+
+        Rows are (symbol_name, line_number, context, signature, parent_symbol,
+        declaration_position, symbol_type, scope, has_body). Several lint rules
+        filter the same file's symbols, so the rows are read once and reused
+        until the database changes.
+        """
+        file_id = self.get_file_id(file_path)
+        if file_id is None:
+            return []
+
+        self._check_caches()
+        rows = self._symbol_rows.get(file_id)
+        if rows is None:
+            cursor = self.reader.execute(
+                """
+                SELECT symbol_name, line_number, context, signature,
+                       parent_symbol, declaration_position,
+                       symbol_type, scope, has_body
+                FROM symbols
+                WHERE file_id = ?
+                ORDER BY symbol_id
+                """,
+                (file_id,),
+            )
+            rows = self._symbol_rows[file_id] = cursor.fetchall()
+        return rows
+
+    def get_duplicate_function_names(self) -> set[str]:
+        """Get the names defined by more than one function with the same parameter count
+
+        One GROUP BY over the whole project answers this for every file.
+        """
+        cursor = self.reader.execute(
+            """
+            SELECT symbol_name
+            FROM symbols
+            WHERE symbol_type = 'function'
+            GROUP BY symbol_name, param_count
+            HAVING COUNT(*) > 1
+            """
+        )
+        return {row[0] for row in cursor}
 
     def get_file_hash(self, file_path: Path) -> str | None:
         """Get stored hash for a file"""
-        file_path_abs = str(file_path.resolve())
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.execute(
-                "SELECT file_hash FROM files WHERE file_path = ?", (file_path_abs,)
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
-        finally:
-            conn.close()
+        file_path_abs = self.resolve_path(file_path)
+        conn = self.conn
+        cursor = conn.execute("SELECT file_hash FROM files WHERE file_path = ?", (file_path_abs,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+    def get_file_hashes(self) -> dict[str, str]:
+        """Get stored hashes for all parsed files, keyed by absolute path"""
+        cursor = self.conn.execute(
+            "SELECT file_path, file_hash FROM files WHERE file_hash IS NOT NULL"
+        )
+        return dict(cursor.fetchall())
 
     def get_transitive_includes(self, file_path: Path) -> list[int]:
         """Get IDs of all files included by this file (transitively)"""
-        file_path_abs = str(file_path.resolve())
-        conn = sqlite3.connect(self.db_path)
-        try:
-            # Recursive CTE to find all included files
-            cursor = conn.execute(
-                """
-                WITH RECURSIVE transitive_includes(id) AS (
-                    SELECT included_file_id 
-                    FROM includes 
-                    JOIN files ON includes.source_file_id = files.file_id
-                    WHERE files.file_path = ? AND included_file_id IS NOT NULL
+        file_path_abs = self.resolve_path(file_path)
+        conn = self.conn
+        # Recursive CTE to find all included files
+        cursor = conn.execute(
+            """
+            WITH RECURSIVE transitive_includes(id) AS (
+                SELECT included_file_id 
+                FROM includes 
+                JOIN files ON includes.source_file_id = files.file_id
+                WHERE files.file_path = ? AND included_file_id IS NOT NULL
                     
-                    UNION
+                UNION
                     
-                    SELECT i.included_file_id
-                    FROM includes i
-                    JOIN transitive_includes ti ON i.source_file_id = ti.id
-                    WHERE i.included_file_id IS NOT NULL
-                )
-                SELECT id FROM transitive_includes
-                """,
-                (file_path_abs,),
+                SELECT i.included_file_id
+                FROM includes i
+                JOIN transitive_includes ti ON i.source_file_id = ti.id
+                WHERE i.included_file_id IS NOT NULL
             )
-            return [row[0] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+            SELECT id FROM transitive_includes
+            """,
+            (file_path_abs,),
+        )
+        return [row[0] for row in cursor]
 
     def get_visible_symbols(self, file_path: Path) -> dict[str, list[dict]]:
         """Get all symbols visible to this file (own symbols + transitively included)"""
-        file_path_abs = str(file_path.resolve())
-        include_ids = self.get_transitive_includes(file_path)
-
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            # Get file_id of current file
-            cursor = conn.execute("SELECT file_id FROM files WHERE file_path = ?", (file_path_abs,))
-            res = cursor.fetchone()
-            if not res:
-                return {"functions": [], "variables": [], "constants": [], "event_handlers": []}
-            file_id = res[0]
-
-            all_ids = [file_id] + include_ids
-            placeholders = ",".join("?" * len(all_ids))
+        file_path_abs = self.resolve_path(file_path)
 
-            cursor = conn.execute(
+        conn = self.conn
+        # The include closure is expanded inside SQLite and joined directly,
+        # so the file ids never round-trip through a Python list
+        cursor = conn.execute(
+            _VISIBLE_FILES_CTE
+            + """
+            SELECT symbol_name, symbol_type, scope, parent_symbol, context, param_count
+            FROM symbols
+            WHERE file_id IN (SELECT id FROM visible_files)
+            """,
+            (file_path_abs,),
+        )
+        cursor.row_factory = sqlite3.Row
+
+        symbols = {"functions": [], "variables": [], "constants": [], "event_handlers": []}
+        for row in cursor:
+            s_type = row["symbol_type"]
+            s_data = dict(row)
+            if s_type == "function":
+                symbols["functions"].append(s_data)
+            elif s_type == "variable":
+                symbols["variables"].append(s_data)
+            elif s_type == "constant":
+                symbols["constants"].append(s_data)
+            elif s_type == "event_handler":
+                symbols["event_handlers"].append(s_data)
+
+        return symbols
+
+    def get_visible_symbol_names(self, file_path: Path) -> set[str]:
+        """Get the distinct names of the symbols get_visible_symbols returns
+
+        Linting a project asks this for every file, and most of them see the
+        same shared headers. The visible files come from the cached include
+        graph and each file's names are read once, so a header's symbols are
+        fetched once per project rather than once per includer.
+        """
+        start_id = self.get_file_id(file_path)
+        if start_id is None:
+            return set()
+
+        adj = self._load_include_graph()
+        visible = {start_id}
+        stack = [start_id]
+        while stack:
+            for dst in adj.get(stack.pop(), ()):
+                if dst not in visible:
+                    visible.add(dst)
+                    stack.append(dst)
+
+        self._check_caches()
+        file_names = self._symbol_names
+        missing = [file_id for file_id in visible if file_id not in file_names]
+        for chunk in param_chunks(missing):
+            for file_id in chunk:
+                file_names[file_id] = set()
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.reader.execute(
                 f"""
-                SELECT symbol_name, symbol_type, scope, parent_symbol, context, param_count
+                SELECT file_id, symbol_name
                 FROM symbols
                 WHERE file_id IN ({placeholders})
+                  AND symbol_type IN ('function', 'variable', 'constant', 'event_handler')
                 """,
-                all_ids,
+                chunk,
             )
+            for file_id, name in cursor:
+                file_names[file_id].add(name)
+
+        return set().union(*(file_names[file_id] for file_id in visible))
 
-            symbols = {"functions": [], "variables": [], "constants": [], "event_handlers": []}
-            for row in cursor.fetchall():
-                s_type = row["symbol_type"]
-                s_data = dict(row)
-                if s_type == "function":
-                    symbols["functions"].append(s_data)
-                elif s_type == "variable":
-                    symbols["variables"].append(s_data)
-                elif s_type == "constant":
-                    symbols["constants"].append(s_data)
-                elif s_type == "event_handler":
-                    symbols["event_handlers"].append(s_data)
-
-            return symbols
-        finally:
-            conn.close()
+    def _load_include_graph(self) -> dict[int, dict[int, None]]:
+        """Return the resolved include edges as adjacency sets, keyed by file id
+
+        Lint checks every file in turn, so the graph is loaded once and reused
+        until the database changes.
+        """
+        stamp = self._change_stamp()
+        if self._include_graph is not None and self._include_graph[0] == stamp:
+            return self._include_graph[1]
+
+        cursor = self.conn.execute("""
+            SELECT source_file_id, included_file_id
+            FROM includes
+            WHERE included_file_id IS NOT NULL
+            ORDER BY include_id
+        """)
+        # Build the adjacency lists straight from the cursor rather than
+        # materializing the whole edge list first. A header included twice
+        # is one edge; repeating it would report the same cycle twice.
+        cursor.arraysize = 1000
+        adj: dict[int, dict[int, None]] = {}
+        for src, dst in cursor:
+            if src not in adj:
+                adj[src] = {}
+            adj[src][dst] = None
+
+        self._include_graph = (stamp, adj)
+        return adj
+
+    def _files_reaching_cycles(self) -> set[int]:
+        """Return the ids of files from which some include cycle is reachable
+
+        One walk over the whole graph answers this for every file, so the
+        files of an acyclic project skip the per-file cycle search entirely.
+        """
+        # The graph is reloaded whenever the database changes, so the result
+        # stays valid for as long as the same graph object is returned
+        adj = self._load_include_graph()
+        if self._cycle_reach is not None and self._cycle_reach[0] is adj:
+            return self._cycle_reach[1]
+
+        reaching: set[int] = set()
+        done: set[int] = set()
+        on_path: set[int] = set()
+        path: list[int] = []
+        stack: list[Iterator[int]] = []
+        for root in adj:
+            if root in done:
+                continue
+            path.append(root)
+            on_path.add(root)
+            stack.append(iter(adj[root]))
+            while stack:
+                u = path[-1]
+                for v in stack[-1]:
+                    if v in on_path:
+                        # Back edge: u lies on a cycle
+                        reaching.add(u)
+                    elif v in done:
+                        if v in reaching:
+                            reaching.add(u)
+                    else:
+                        path.append(v)
+                        on_path.add(v)
+                        stack.append(iter(adj.get(v, ())))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    on_path.discard(u)
+                    done.add(u)
+                    if u in reaching and path:
+                        reaching.add(path[-1])
+
+        self._cycle_reach = (adj, reaching)
+        return reaching
 
     def detect_circular_includes(self, file_path: Path) -> list[list[str]]:
         """Detect circular include dependencies starting from a file"""
-        file_path_abs = str(file_path.resolve())
-        conn = sqlite3.connect(self.db_path)
-        try:
-            # Query all includes to build a graph
-            cursor = conn.execute("""
-                SELECT f1.file_path, f2.file_path
-                FROM includes i
-                JOIN files f1 ON i.source_file_id = f1.file_id
-                JOIN files f2 ON i.included_file_id = f2.file_id
-            """)
-            edges = cursor.fetchall()
-
-            adj = {}
-            for src, dst in edges:
-                if src not in adj:
-                    adj[src] = []
-                adj[src].append(dst)
-
-            cycles = []
-            visited = set()
-            path = []
-
-            def find_cycles(u):
-                visited.add(u)
-                path.append(u)
-
-                for v in adj.get(u, []):
-                    if v in path:
-                        idx = path.index(v)
-                        cycles.append(path[idx:] + [v])
-                    elif v not in visited:
-                        find_cycles(v)
-
-                path.pop()
-
-            find_cycles(file_path_abs)
-            return cycles
-        finally:
-            conn.close()
+        conn = self.conn
+        start_id = self.get_file_id(file_path)
+        if start_id is None or start_id not in self._files_reaching_cycles():
+            return []
+
+        # Walk the graph on file ids; paths are only needed for reported cycles
+        adj = self._load_include_graph()
+
+        cycles: list[list[int]] = []
+        visited: set[int] = set()
+        path: list[int] = []
+        # node -> its index in path, for O(1) back-edge checks
+        on_path: dict[int, int] = {}
+        # Explicit DFS stack of neighbour iterators, so deep include chains
+        # cannot hit the recursion limit
+        stack: list[Iterator[int]] = []
+
+        def enter(u: int) -> None:
+            visited.add(u)
+            on_path[u] = len(path)
+            path.append(u)
+            stack.append(iter(adj.get(u, ())))
+
+        enter(start_id)
+        while stack:
+            for v in stack[-1]:
+                if v in on_path:
+                    cycles.append(path[on_path[v] :] + [v])
+                elif v not in visited:
+                    enter(v)
+                    break
+            else:
+                stack.pop()
+                del on_path[path.pop()]
+
+        if not cycles:
+            return []
+
+        # One batched lookup maps every file id in the cycles back to its path
+        cycle_ids = list({file_id for cycle in cycles for file_id in cycle})
+        placeholders = ",".join("?" * len(cycle_ids))
+        cursor = conn.execute(
+            f"SELECT file_id, file_path FROM files WHERE file_id IN ({placeholders})",
+            cycle_ids,
+        )
+        id_to_path = dict(cursor.fetchall())
+        return [[id_to_path[file_id] for file_id in cycle] for cycle in cycles]
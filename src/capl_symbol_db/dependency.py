@@ -1,97 +1,337 @@
-import sqlite3
+import hashlib
+import json
+import os
+import re
 from pathlib import Path
 
-from capl_tree_sitter.parser import CAPLParser
+from capl_tree_sitter.parser import CAPLParser, read_source
 from capl_tree_sitter.queries import CAPLQueryHelper
 
-from .database import SymbolDatabase
+from .database import SymbolDatabase, param_chunks
+from .workers import map_files, worker_parser
+
+INCLUDES_QUERY = """
+    (preproc_include
+      path: [(string_literal) (system_lib_string)] @path) @include
+"""
+
+# A directive on its own line: #include "file" or #include <file>
+INCLUDE_PATTERN = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*[<"]([^<>"\r\n]*)[>"]', re.MULTILINE)
+
+# Anything the preprocessor may read as an include directive, wherever it is
+DIRECTIVE_PATTERN = re.compile(rb"#[ \t]*include")
+
+_QUERY_HELPER = CAPLQueryHelper()
 
 
 class DependencyAnalyzer:
     """Analyzes #include dependencies in CAPL files"""
 
-    def __init__(self, db: SymbolDatabase, search_paths: list[str] = None):
+    def __init__(
+        self,
+        db: SymbolDatabase,
+        search_paths: list[str] = None,
+        strict: bool = False,
+        parser: CAPLParser | None = None,
+    ):
         self.db = db
         self.search_paths = search_paths or []
-        self.parser = CAPLParser()
-        self.query_helper = CAPLQueryHelper()
+        # strict always parses with tree-sitter instead of scanning with a regex
+        self.strict = strict
+        # directory -> normalized entry names, listed once per directory
+        self._listings: dict[Path, frozenset[str]] = {}
+        # (include path, including directory) -> resolved include, or None
+        self._resolved: dict[tuple[str, Path], Path | None] = {}
+        self.parser = parser or CAPLParser()
+
+    def analyze_file(
+        self, file_path: Path, file_id: int | None = None, source: bytes | None = None
+    ) -> int:
+        """Extract and store dependencies for a file
 
-    def analyze_file(self, file_path: Path) -> int:
-        """Extract and store dependencies for a file"""
+        Args:
+            file_path: Path to the file
+            file_id: ID from a prior store_file call (registered here if omitted)
+            source: File contents if the caller already read them
+        """
         file_path = file_path.resolve()
+        if source is None:
+            source = read_source(file_path)
 
-        result = self.parser.parse_file(file_path)
-        root = result.tree.root_node
-        source = result.source
+        # Unchanged content reuses the includes cached from its last parse
+        source_hash = hashlib.md5(source).hexdigest()
+        cached = self._load_cached_includes([file_path]).get(file_path)
+        if cached is not None and cached[0] == source_hash:
+            includes = cached[1]
+        else:
+            includes = self._extract_includes(source)
+            self._cache_includes([(file_path, source_hash, includes)])
 
         # Register file in DB (using existing DB instance)
-        with open(file_path, "rb") as f:
-            file_id = self.db.store_file(file_path, f.read())
+        if file_id is None:
+            file_id = self.db.store_file(file_path, source)
+
+        self._store_includes([(file_id, file_path, includes)])
+        return file_id
+
+    def analyze_files(
+        self,
+        file_paths: list[Path],
+        max_workers: int | None = None,
+        sources: dict[Path, bytes] | None = None,
+    ) -> dict[Path, int]:
+        """Extract and store dependencies for many files, parsing them in worker processes
+
+        Parsing is CPU-bound and runs in a process pool; the includes are
+        resolved and written from this process, in one transaction, so SQLite
+        keeps a single writer and commits once. Files whose content matches
+        the include cache are not parsed at all, and files the include regex
+        handles are scanned here; only the rest are sent to the pool, or
+        parsed here when max_workers is 1. Files are registered without a
+        content hash, whatever the batch size; the hash is written by
+        whoever stores the file's symbols.
 
-        # Extract includes
-        query = """
-            (preproc_include
-              path: [(string_literal) (system_lib_string)] @path) @include
+        Args:
+            file_paths: Files to analyze
+            max_workers: Size of the process pool (1 parses in this process)
+            sources: Contents the caller already read, keyed by the given path
+
+        Returns:
+            file_id per resolved file path
+        """
+        given = {Path(p).resolve(): Path(p) for p in file_paths}
+        paths = list(given)
+        file_ids = self.db.register_files(paths)
+        cached = self._load_cached_includes(paths)
+        sources = sources or {}
+
+        # Each file read here is only held while it is handled; a file sent to
+        # the pool is read again by its worker
+        found = {}
+        extracted = []
+        to_parse = []
+        for path in paths:
+            source = sources.get(given[path])
+            if source is None:
+                source = read_source(path)
+            source_hash = hashlib.md5(source).hexdigest()
+            entry = cached.get(path)
+            if entry is not None and entry[0] == source_hash:
+                found[path] = entry[1]
+                continue
+            includes = None if self.strict else self._scan_includes(source)
+            if includes is None:
+                if max_workers != 1:
+                    to_parse.append(path)
+                    continue
+                includes = _parse_includes(self.parser, source)
+            extracted.append((path, source_hash, includes))
+
+        # The pool only starts if a file still needs a parse
+        if to_parse:
+            extracted.extend(map_files(_extract_file_includes, to_parse, max_workers))
+        if extracted:
+            self._cache_includes(extracted)
+
+        # Store in input order so include rows keep the order the files were given
+        found.update((path, includes) for path, _, includes in extracted)
+        self._store_includes([(file_ids[str(path)], path, found[path]) for path in paths])
+        return {path: file_ids[str(path)] for path in paths}
+
+    def _extract_includes(self, source_code: bytes) -> list[tuple[str, int]]:
+        """Return (include path, line number) for every #include in a file"""
+        if not self.strict:
+            includes = self._scan_includes(source_code)
+            if includes is not None:
+                return includes
+
+        return _parse_includes(self.parser, source_code)
+
+    def _scan_includes(self, source_code: bytes) -> list[tuple[str, int]] | None:
+        """Find includes with a regex, or return None when a parse is needed
+
+        Only unambiguous files are scanned: every '#include' must be a
+        directive at the start of a line and outside block comments.
+        Anything else (commented-out or inline directives) goes to tree-sitter.
         """
-        matches = self.query_helper.query(query, root)
+        expected = len(DIRECTIVE_PATTERN.findall(source_code))
+        if expected == 0:
+            return []
+
+        includes = []
+        line_number = 1
+        last = 0
+        for m in INCLUDE_PATTERN.finditer(source_code):
+            start = m.start()
+            # The previous directive was outside any comment, so a comment
+            # around this one must open after it; each byte is searched once
+            comment = source_code.rfind(b"/*", last, start)
+            if comment != -1 and source_code.find(b"*/", comment, start) == -1:
+                return None
+            line_number += source_code.count(b"\n", last, start)
+            last = start
+            includes.append((m.group(1).decode("utf8"), line_number))
 
+        return includes if len(includes) == expected else None
+
+    def _load_cached_includes(
+        self, paths: list[Path]
+    ) -> dict[Path, tuple[str, list[tuple[str, int]]]]:
+        """Return the cached (content hash, includes) of every path in the cache"""
+        by_path = {str(path): path for path in paths}
+        keys = list(by_path)
+        cached = {}
+        for chunk in param_chunks(keys):
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.db.conn.execute(
+                f"""
+                SELECT file_path, content_hash, includes_json FROM include_cache
+                WHERE file_path IN ({placeholders})
+                """,
+                chunk,
+            )
+            for file_path, content_hash, includes_json in cursor:
+                includes = [tuple(inc) for inc in json.loads(includes_json)]
+                cached[by_path[file_path]] = (content_hash, includes)
+        return cached
+
+    def _cache_includes(self, extracted: list[tuple[Path, str, list[tuple[str, int]]]]):
+        conn = self.db.conn
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO include_cache (file_path, content_hash, includes_json)
+                VALUES (?, ?, ?)
+                """,
+                [
+                    (str(path), source_hash, json.dumps(includes))
+                    for path, source_hash, includes in extracted
+                ],
+            )
+
+    def _store_includes(self, entries: list[tuple[int, Path, list[tuple[str, int]]]]):
+        """Replace the stored includes of (file_id, file_path, includes) entries"""
         # Pre-resolve and pre-store files to avoid locking issues
-        include_data = []
-        for m in matches:
-            if "path" in m.captures:
-                path_node = m.captures["path"]
-                include_text = source[path_node.start_byte : path_node.end_byte]
-                include_path = include_text.strip('"<>')
+        rows = []
+        for file_id, file_path, includes in entries:
+            for include_path, line_number in includes:
                 resolved_path = self._resolve_path(include_path, file_path)
+                rows.append((file_id, resolved_path, include_path, line_number))
 
-                included_file_id = None
-                if resolved_path:
-                    included_file_id = self.db.get_or_create_file_id(resolved_path)
+        # Fetch/create IDs for all resolved includes in one batch
+        file_ids = self.db.register_files([row[1] for row in rows if row[1]])
 
-                include_data.append(
-                    {
-                        "path_node": path_node,
-                        "include_path": include_path,
-                        "included_file_id": included_file_id,
-                        "is_resolved": resolved_path is not None,
-                    }
-                )
+        conn = self.db.conn
+        with conn:
+            conn.executemany(
+                "DELETE FROM includes WHERE source_file_id = ?",
+                [(file_id,) for file_id, _, _ in entries],
+            )
 
-        conn = sqlite3.connect(self.db.db_path)
-        try:
-            with conn:
-                conn.execute("DELETE FROM includes WHERE source_file_id = ?", (file_id,))
-
-                for data in include_data:
-                    conn.execute(
-                        """
-                        INSERT INTO includes (source_file_id, included_file_id, include_path, 
-                                           line_number, is_resolved)
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
-                        (
-                            file_id,
-                            data["included_file_id"],
-                            data["include_path"],
-                            data["path_node"].start_point[0] + 1,
-                            data["is_resolved"],
-                        ),
+            conn.executemany(
+                """
+                INSERT INTO includes (source_file_id, included_file_id, include_path, 
+                                   line_number, is_resolved)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                [
+                    (
+                        file_id,
+                        file_ids[self.db.resolve_path(resolved_path)] if resolved_path else None,
+                        include_path,
+                        line_number,
+                        resolved_path is not None,
                     )
-        finally:
-            conn.close()
-
-        return file_id
+                    for file_id, resolved_path, include_path, line_number in rows
+                ],
+            )
 
     def _resolve_path(self, include_path: str, source_file: Path) -> Path | None:
+        # Shared headers are included from many files in the same directory
+        key = (include_path, source_file.parent)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        resolved = None
         # Relative to source
         candidate = source_file.parent / include_path
-        if candidate.exists():
-            return candidate.resolve()
+        if self._exists(candidate):
+            resolved = candidate.resolve()
+        else:
+            # Search paths
+            for p in self.search_paths:
+                candidate = Path(p) / include_path
+                if self._exists(candidate):
+                    resolved = candidate.resolve()
+                    break
+
+        self._resolved[key] = resolved
+        return resolved
+
+    def _exists(self, path: Path) -> bool:
+        """Look a path up in its directory's cached listing instead of probing it"""
+        names = self._listings.get(path.parent)
+        if names is None:
+            try:
+                names = frozenset(os.path.normcase(name) for name in os.listdir(path.parent))
+            except OSError:
+                names = frozenset()
+            self._listings[path.parent] = names
+        return os.path.normcase(path.name) in names
+
+
+def _include_prefix_end(source_code: bytes) -> int:
+    """Return the length of the prefix that holds every #include
+
+    Includes sit in the header of a file, so only this prefix needs a parse.
+    The cut is moved past line continuations and past the end of a block
+    comment that is still open, so the prefix parses as the full file would.
+    Without a directive candidate the whole file is parsed.
+    """
+    start = -1
+    for m in DIRECTIVE_PATTERN.finditer(source_code):
+        start = m.start()
+    if start == -1:
+        return len(source_code)
+
+    end = start
+    while True:
+        newline = source_code.find(b"\n", end)
+        if newline == -1:
+            return len(source_code)
+        end = newline + 1
+        if not source_code[max(0, newline - 2) : newline].rstrip(b"\r").endswith(b"\\"):
+            break
+
+    comment = source_code.rfind(b"/*", 0, end)
+    if comment != -1 and source_code.find(b"*/", comment + 2, end) == -1:
+        close = source_code.find(b"*/", end)
+        return len(source_code) if close == -1 else close + 2
+    return end
+
+
+def _parse_includes(parser: CAPLParser, source_code: bytes) -> list[tuple[str, int]]:
+    """Return (include path, line number) for every #include, using tree-sitter"""
+    cutoff = _include_prefix_end(source_code)
+
+    # Node offsets are byte offsets, so slice the raw bytes and decode only
+    # each include path rather than the whole file
+    root = parser.parse_tree(source_code[:cutoff]).root_node
+
+    includes = []
+    for path_node in _QUERY_HELPER.captures(INCLUDES_QUERY, root).get("path", ()):
+        include_text = source_code[path_node.start_byte : path_node.end_byte].decode("utf8")
+        includes.append((include_text.strip('"<>'), path_node.start_point[0] + 1))
+    return includes
+
 
-        # Search paths
-        for p in self.search_paths:
-            candidate = Path(p) / include_path
-            if candidate.exists():
-                return candidate.resolve()
+def _extract_file_includes(file_path: Path) -> tuple[Path, str, list[tuple[str, int]]]:
+    """Process pool worker: parse one file and extract its includes
 
-        return None
+    Files reach a worker only after the regex scan gave up, so it is skipped.
+    """
+    source = read_source(file_path)
+    includes = _parse_includes(worker_parser(), source)
+    return file_path, hashlib.md5(source).hexdigest(), includes
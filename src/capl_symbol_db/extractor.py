@@ -10,27 +10,45 @@ from .models import SymbolInfo
 class SymbolExtractor:
     """Extracts symbols and type definitions from CAPL AST"""
 
-    def __init__(self):
-        self.parser = CAPLParser()
+    def __init__(self, parser: CAPLParser | None = None):
+        self.parser = parser or CAPLParser()
         self.query_helper = CAPLQueryHelper()
-        self.current_file_types = {}
+        self.current_file_types: dict[str, str] = {}
+        # Per-file cache: resolved path -> (mtime_ns, size, symbols, file types)
+        self._parse_cache: dict[Path, tuple[int, int, list[SymbolInfo], dict[str, str]]] = {}
 
     def extract_all(self, file_path: Path) -> list[SymbolInfo]:
-        """Full extraction of symbols from a file"""
+        """Full extraction of symbols from a file.
+
+        Results are cached per file and reused as long as the file's
+        modification time and size are unchanged, so repeated runs over an
+        unchanged project skip parsing entirely.
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        cached = self._parse_cache.get(file_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            self.current_file_types = dict(cached[3])
+            return list(cached[2])
+
         result = self.parser.parse_file(file_path)
         root = result.tree.root_node
-        source = result.source
+        # Work on the raw bytes so node text lookups slice them directly
+        # instead of re-encoding the whole decoded source for every node.
+        source = result.source_bytes
 
         self.current_file_types = {}
 
+        funcs, decls = self._collect_functions_and_declarations(root)
+
         symbols = []
         symbols.extend(self._extract_enum_definitions(root, source))
         symbols.extend(self._extract_struct_definitions(root, source))
-        symbols.extend(self._extract_event_handlers(root, source))
-        symbols.extend(self._extract_functions(root, source))
+        symbols.extend(self._extract_event_handlers(funcs, source))
+        symbols.extend(self._extract_functions(funcs, decls, source))
         symbols.extend(self._extract_variables_block(root, source))
-        symbols.extend(self._extract_global_variables(root, source))
-        symbols.extend(self._extract_all_local_variables(root, source))
+        symbols.extend(self._extract_global_variables(decls, source))
+        symbols.extend(self._extract_all_local_variables(funcs, source))
         symbols.extend(self._extract_type_usages(root, source))
 
         # Filter duplicates that might arise from query overlaps
@@ -42,9 +60,24 @@ class SymbolExtractor:
                 seen.add(key)
                 unique_symbols.append(s)
 
-        return unique_symbols
+        self._parse_cache[file_path] = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            unique_symbols,
+            dict(self.current_file_types),
+        )
+        return list(unique_symbols)
 
-    def _extract_enum_definitions(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _collect_functions_and_declarations(self, root: Node) -> tuple[list[Node], list[Node]]:
+        """Gather function definitions and declarations in a single tree walk"""
+        query = """
+            (function_definition) @func
+            (declaration) @decl
+        """
+        captures = self.query_helper.captures(query, root)
+        return captures.get("func", []), captures.get("decl", [])
+
+    def _extract_enum_definitions(self, root: Node, source: bytes) -> list[SymbolInfo]:
         symbols = []
         # We need to ensure it has a body to be a definition
         query = """
@@ -95,7 +128,7 @@ class SymbolExtractor:
                             )
         return symbols
 
-    def _extract_struct_definitions(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_struct_definitions(self, root: Node, source: bytes) -> list[SymbolInfo]:
         symbols = []
         query = """
             (struct_specifier
@@ -127,13 +160,13 @@ class SymbolExtractor:
                 )
         return symbols
 
-    def _extract_event_handlers(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_event_handlers(self, funcs: list[Node], source: bytes) -> list[SymbolInfo]:
         symbols = []
         # Use CAPLPatterns to find event handlers
-        for func in ASTWalker.find_all_by_type(root, "function_definition"):
+        for func in funcs:
             if CAPLPatterns.is_event_handler(func, source):
                 name = CAPLPatterns.get_function_name(func, source) or "unknown"
-                signature = ASTWalker.get_text(func, source).split("{")[0].strip()
+                signature = ASTWalker.get_header_text(func, source)
 
                 # Heuristic to identify event type
                 context = "event"
@@ -162,14 +195,13 @@ class SymbolExtractor:
         # Fallback for some regex cases if needed, but CAPLPatterns should handle most
         return symbols
 
-    def _extract_functions(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_functions(
+        self, funcs: list[Node], decls: list[Node], source: bytes
+    ) -> list[SymbolInfo]:
         symbols = []
 
         # 1. Extract definitions
-        query_def = "(function_definition) @func"
-        matches_def = self.query_helper.query(query_def, root)
-        for m in matches_def:
-            func_node = m.node
+        for func_node in funcs:
             if CAPLPatterns.is_event_handler(func_node, source):
                 continue
 
@@ -179,7 +211,7 @@ class SymbolExtractor:
                     name=name,
                     symbol_type="function",
                     line_number=func_node.start_point[0] + 1,
-                    signature=ASTWalker.get_text(func_node, source).split("{")[0].strip(),
+                    signature=ASTWalker.get_header_text(func_node, source),
                     scope="global",
                     param_count=self._count_parameters(func_node, source),
                     has_body=True,
@@ -187,10 +219,7 @@ class SymbolExtractor:
             )
 
         # 2. Extract prototypes (forward declarations)
-        query_decl = "(declaration) @decl"
-        matches_decl = self.query_helper.query(query_decl, root)
-        for m in matches_decl:
-            decl_node = m.node
+        for decl_node in decls:
             if CAPLPatterns.is_function_declaration(decl_node):
                 name = CAPLPatterns.get_function_name(decl_node, source) or "unknown_func"
                 symbols.append(
@@ -207,18 +236,14 @@ class SymbolExtractor:
 
         return symbols
 
-    def _extract_variables_block(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_variables_block(self, root: Node, source: bytes) -> list[SymbolInfo]:
         # Variables block itself is not usually stored as a symbol,
         # but its contents are marked as scope='variables_block'
         return []
 
-    def _extract_global_variables(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_global_variables(self, decls: list[Node], source: bytes) -> list[SymbolInfo]:
         symbols = []
-        query = "(declaration) @decl"
-        matches = self.query_helper.query(query, root)
-        for m in matches:
-            node = m.node
-
+        for node in decls:
             if CAPLPatterns.is_function_declaration(node):
                 continue
 
@@ -245,12 +270,9 @@ class SymbolExtractor:
                 )
         return symbols
 
-    def _extract_all_local_variables(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_all_local_variables(self, funcs: list[Node], source: bytes) -> list[SymbolInfo]:
         symbols = []
-        query = "(function_definition) @func"
-        matches = self.query_helper.query(query, root)
-        for m in matches:
-            func_node = m.node
+        for func_node in funcs:
             func_name = CAPLPatterns.get_function_name(func_node, source) or "unknown"
 
             # 1. Extract parameters as local variables
@@ -309,7 +331,7 @@ class SymbolExtractor:
                         first_non_decl_line = child.start_point[0]
         return symbols
 
-    def _count_parameters(self, func_node: Node, source: str) -> int:
+    def _count_parameters(self, func_node: Node, source: bytes) -> int:
         """Count parameters in function signature"""
         declarator = ASTWalker.get_child_of_type(func_node, "function_declarator")
         if not declarator:
@@ -330,7 +352,7 @@ class SymbolExtractor:
         body = ASTWalker.get_child_of_type(func_node, "compound_statement")
         return body is not None
 
-    def _extract_type_usages(self, root: Node, source: str) -> list[SymbolInfo]:
+    def _extract_type_usages(self, root: Node, source: bytes) -> list[SymbolInfo]:
         symbols = []
         # Look for declarations where the type is a known enum/struct
         # but the keyword (enum/struct) is missing.
@@ -47,3 +47,19 @@ def test_database_storage(tmp_path):
     import hashlib
 
     assert stored_hash == hashlib.md5(code).hexdigest()
+
+
+def test_extraction_cache_invalidated_on_change(tmp_path):
+    extractor = SymbolExtractor()
+    file_path = tmp_path / "cached.can"
+    file_path.write_text("void FuncA() {}\n")
+
+    first = extractor.extract_all(file_path)
+    assert [s.name for s in first if s.symbol_type == "function"] == ["FuncA"]
+
+    # Unchanged file is served from the cache
+    assert extractor.extract_all(file_path) == first
+
+    file_path.write_text("void FuncB(int x) {}\n")
+    second = extractor.extract_all(file_path)
+    assert [s.name for s in second if s.symbol_type == "function"] == ["FuncB"]
@@ -0,0 +1,38 @@
+"""Process pool plumbing shared by the analyzers' batch paths
+
+Parsing and extraction are CPU-bound, so batch analysis hands files to
+worker processes. Workers only parse and extract; the results come back to
+the calling process, which writes them so SQLite keeps a single writer.
+"""
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+from capl_tree_sitter.parser import CAPLParser
+
+T = TypeVar("T")
+
+_parser: CAPLParser | None = None
+
+
+def worker_parser() -> CAPLParser:
+    """Parser reused by every file handled in this process"""
+    global _parser
+    if _parser is None:
+        _parser = CAPLParser()
+    return _parser
+
+
+def map_files(func: Callable[[Path], T], paths: list[Path], max_workers: int | None) -> Iterator[T]:
+    """Yield func(path) for every path, in order, from a process pool
+
+    A single file, or max_workers=1, is handled in this process, where
+    starting a pool would cost more than it saves.
+    """
+    if max_workers == 1 or len(paths) < 2:
+        yield from map(func, paths)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        yield from pool.map(func, paths)
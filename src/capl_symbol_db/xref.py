@@ -1,15 +1,32 @@
-import sqlite3
+import hashlib
+from bisect import bisect_right
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
 from capl_tree_sitter.ast_walker import ASTWalker
-from capl_tree_sitter.parser import CAPLParser
+from capl_tree_sitter.parser import CAPLParser, read_source
 from capl_tree_sitter.queries import CAPLQueryHelper
 
-from .database import SymbolDatabase
+from .database import SymbolDatabase, insert_rows
+from .workers import map_files, worker_parser
 
+# One multi-pattern query so the tree is walked once per file
+REFERENCES_QUERY = """
+    (function_definition) @function
+    (call_expression function: (identifier) @func_name)
+    (identifier) @id
+    (declaration (identifier) @skip)
+    (init_declarator (identifier) @skip)
+    (parameter_declaration (identifier) @skip)
+    (function_declarator (identifier) @skip)
+    (assignment_expression left: (identifier) @assign)
+"""
 
-@dataclass
+_QUERY_HELPER = CAPLQueryHelper()
+
+
+@dataclass(slots=True)
 class SymbolReference:
     """Represents a usage of a symbol in CAPL code"""
 
@@ -24,122 +41,192 @@ class SymbolReference:
 class CrossReferenceBuilder:
     """Tracks symbol usages and builds a call graph"""
 
-    def __init__(self, db: SymbolDatabase):
+    def __init__(self, db: SymbolDatabase, parser: CAPLParser | None = None):
         self.db = db
-        self.parser = CAPLParser()
-        self.query_helper = CAPLQueryHelper()
-
-    def analyze_file_references(self, file_path: Path) -> int:
-        """Scan a file for symbol usages and store them in the DB"""
+        self.parser = parser or CAPLParser()
+        # resolved path -> (content hash, reference count) of the last analysis
+        self._ref_cache: dict[Path, tuple[str, int]] = {}
+
+    def analyze_file_references(
+        self, file_path: Path, file_id: int | None = None, source: bytes | None = None
+    ) -> int:
+        """Scan a file for symbol usages and store them in the DB
+
+        Args:
+            file_path: Path to the file
+            file_id: ID from a prior store_file call (registered here if omitted)
+            source: File contents if the caller already read them
+        """
         file_path_abs = file_path.resolve()
-
-        result = self.parser.parse_file(file_path_abs)
-        root = result.tree.root_node
-        source = result.source
+        # tree-sitter reports byte offsets, so slice the raw bytes rather than
+        # the decoded string (they diverge as soon as non-ASCII text appears)
+        if source is None:
+            source = read_source(file_path_abs)
 
         # Register/get file_id
-        with open(file_path_abs, "rb") as f:
-            file_id = self.db.store_file(file_path_abs, f.read())
-
-        references = []
-        references.extend(self._extract_function_calls(root, source, str(file_path_abs)))
-        references.extend(self._extract_variable_usages(root, source, str(file_path_abs)))
-
-        # Store in database
-        conn = sqlite3.connect(self.db.db_path)
-        try:
-            with conn:
-                conn.execute("DELETE FROM symbol_references WHERE file_id = ?", (file_id,))
-
-                for ref in references:
-                    conn.execute(
-                        """
-                        INSERT INTO symbol_references 
-                        (file_id, symbol_name, line_number, column_number, reference_type, context)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            file_id,
-                            ref.symbol_name,
-                            ref.line_number,
-                            ref.column,
-                            ref.reference_type,
-                            ref.context,
-                        ),
-                    )
-        finally:
-            conn.close()
+        if file_id is None:
+            file_id = self.db.store_file(file_path_abs, source)
+
+        # Unchanged content whose references are still stored needs no re-parse
+        source_hash = hashlib.md5(source).hexdigest()
+        cached = self._ref_cache.get(file_path_abs)
+        if cached and cached[0] == source_hash:
+            if self._stored_reference_count(file_id) == cached[1]:
+                return cached[1]
 
+        root = self.parser.parse_tree(source).root_node
+        references = _extract_references(root, source, str(file_path_abs))
+        self._store_references(file_id, references)
+
+        self._ref_cache[file_path_abs] = (source_hash, len(references))
         return len(references)
 
-    def _extract_function_calls(self, root, source, file_path) -> list[SymbolReference]:
-        refs = []
-        query = "(call_expression function: (identifier) @func_name) @call"
-        matches = self.query_helper.query(query, root)
-
-        for m in matches:
-            if "func_name" in m.captures:
-                node = m.captures["func_name"]
-                name = source[node.start_byte : node.end_byte]
-                refs.append(
-                    SymbolReference(
-                        symbol_name=name,
-                        file_path=file_path,
-                        line_number=node.start_point[0] + 1,
-                        column=node.start_point[1],
-                        reference_type="call",
-                        context=self._get_enclosing_function(node, source),
-                    )
-                )
-        return refs
-
-    def _extract_variable_usages(self, root, source, file_path) -> list[SymbolReference]:
-        refs = []
-        query = "(identifier) @id"
-        matches = self.query_helper.query(query, root)
-
-        for m in matches:
-            node = m.captures["id"]
-            if self._is_actual_usage(node):
-                name = source[node.start_byte : node.end_byte]
-
-                # Determine type
-                ref_type = "usage"
-                parent = node.parent
-                if parent and parent.type == "assignment_expression":
-                    if parent.child_by_field_name("left") == node:
-                        ref_type = "assignment"
-
-                refs.append(
-                    SymbolReference(
-                        symbol_name=name,
-                        file_path=file_path,
-                        line_number=node.start_point[0] + 1,
-                        column=node.start_point[1],
-                        reference_type=ref_type,
-                        context=self._get_enclosing_function(node, source),
+    def analyze_files(
+        self, file_paths: list[Path], max_workers: int | None = None
+    ) -> dict[Path, int]:
+        """Scan many files for symbol usages, parsing them in worker processes
+
+        Parsing and extraction are CPU-bound and run in a process pool; the
+        results are written from this process so SQLite keeps a single writer.
+
+        Returns:
+            Number of stored references per resolved file path
+        """
+        paths = list(dict.fromkeys(Path(p).resolve() for p in file_paths))
+        if max_workers == 1 or len(paths) < 2:
+            return {path: self.analyze_file_references(path) for path in paths}
+
+        file_ids = self.db.register_files(paths)
+        return self._store_results(
+            map_files(_extract_file_references, paths, max_workers), file_ids
+        )
+
+    def _store_results(
+        self,
+        results: Iterable[tuple[Path, str, list[SymbolReference]]],
+        file_ids: dict[str, int],
+    ) -> dict[Path, int]:
+        counts = {}
+        for path, source_hash, references in results:
+            self._store_references(file_ids[str(path)], references)
+            self._ref_cache[path] = (source_hash, len(references))
+            counts[path] = len(references)
+        return counts
+
+    def _store_references(self, file_id: int, references: list[SymbolReference]):
+        conn = self.db.conn
+        # Rows go straight into the clustered table: staging them in a TEMP
+        # table first and copying with INSERT ... SELECT only adds a second write
+        with conn:
+            conn.execute("DELETE FROM symbol_references WHERE file_id = ?", (file_id,))
+            insert_rows(
+                conn,
+                "symbol_references",
+                (
+                    "file_id",
+                    "symbol_name",
+                    "line_number",
+                    "column_number",
+                    "reference_type",
+                    "context",
+                ),
+                [
+                    (
+                        file_id,
+                        ref.symbol_name,
+                        ref.line_number,
+                        ref.column,
+                        ref.reference_type,
+                        ref.context,
                     )
-                )
-        return refs
-
-    def _is_actual_usage(self, node) -> bool:
-        p = node.parent
-        if not p:
-            return False
-        if p.type in (
-            "declaration",
-            "init_declarator",
-            "parameter_declaration",
-            "field_declaration",
-        ):
-            return False
-        if p.type == "function_declarator":
-            return False
-        return True
-
-    def _get_enclosing_function(self, node, source) -> str | None:
-        func_node = ASTWalker.find_parent_of_type(node, "function_definition")
-        if func_node:
-            # Fallback for now: use first line
-            return source[func_node.start_byte : func_node.end_byte].split("{")[0].strip()
-        return None
+                    for ref in references
+                ],
+            )
+
+    def _stored_reference_count(self, file_id: int) -> int:
+        cursor = self.db.conn.execute(
+            "SELECT COUNT(*) FROM symbol_references WHERE file_id = ?", (file_id,)
+        )
+        count: int = cursor.fetchone()[0]
+        return count
+
+
+def _extract_references(root, source, file_path) -> list[SymbolReference]:
+    """Collect calls and variable usages in a single query pass"""
+    captures = _QUERY_HELPER.captures(REFERENCES_QUERY, root)
+    calls = captures.get("func_name", ())
+    # Declared names and assignment targets are captured by the query
+    # itself so the filtering happens in tree-sitter rather than Python.
+    # Called names are already recorded as calls, not as plain usages.
+    skipped = {(node.start_byte, node.end_byte) for node in captures.get("skip", ())}
+    skipped.update((node.start_byte, node.end_byte) for node in calls)
+    assigned = {(node.start_byte, node.end_byte) for node in captures.get("assign", ())}
+
+    # Function byte ranges and headers, computed once; each reference then
+    # finds its enclosing function by bisection instead of a parent walk
+    functions = _index_functions(captures.get("function", ()), source)
+    starts = [start for start, _, _, _ in functions]
+
+    refs = [_make_reference(node, file_path, "call", functions, starts) for node in calls]
+    for node in captures.get("id", ()):
+        span = (node.start_byte, node.end_byte)
+        if span in skipped:
+            continue
+        ref_type = "assignment" if span in assigned else "usage"
+        refs.append(_make_reference(node, file_path, ref_type, functions, starts))
+    return refs
+
+
+def _make_reference(node, file_path, ref_type, functions, starts) -> SymbolReference:
+    return SymbolReference(
+        symbol_name=node.text.decode("utf8"),
+        file_path=file_path,
+        line_number=node.start_point[0] + 1,
+        column=node.start_point[1],
+        reference_type=ref_type,
+        context=_get_enclosing_function(node, functions, starts),
+    )
+
+
+def _index_functions(func_nodes, source) -> list[tuple[int, int, str, int]]:
+    """Return (start, end, header, enclosing index) per function, sorted by start.
+
+    Ranges nest (error recovery can yield nested definitions), so the
+    enclosing index chains each function to the one containing it.
+    """
+    functions: list[tuple[int, int, str, int]] = []
+    stack: list[int] = []
+    for func in sorted(func_nodes, key=lambda n: (n.start_byte, -n.end_byte)):
+        while stack and functions[stack[-1]][1] <= func.start_byte:
+            stack.pop()
+        parent = stack[-1] if stack else -1
+        header = _function_header(func, source)
+        functions.append((func.start_byte, func.end_byte, header, parent))
+        stack.append(len(functions) - 1)
+    return functions
+
+
+def _get_enclosing_function(
+    node, functions: list[tuple[int, int, str, int]], starts: list[int]
+) -> str | None:
+    # Last function starting at or before the node, or one of its ancestors
+    i = bisect_right(starts, node.start_byte) - 1
+    while i >= 0:
+        _, end, header, parent = functions[i]
+        if node.end_byte <= end:
+            return header
+        i = parent
+    return None
+
+
+def _function_header(func_node, source) -> str:
+    # Fallback for now: use the text before the body
+    return ASTWalker.get_header_text(func_node, source)
+
+
+def _extract_file_references(file_path: Path) -> tuple[Path, str, list[SymbolReference]]:
+    """Process pool worker: parse one file and extract its references"""
+    source = read_source(file_path)
+    root = worker_parser().parse_tree(source).root_node
+    references = _extract_references(root, source, str(file_path))
+    return file_path, hashlib.md5(source).hexdigest(), references
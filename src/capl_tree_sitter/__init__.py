@@ -3,7 +3,7 @@
 from .ast_walker import ASTWalker
 from .capl_patterns import CAPLPatterns
 from .node_types import ASTNode, NodeMatch, ParseResult
-from .parser import CAPLParser
+from .parser import CAPLParser, read_source
 from .queries import CAPLQueryHelper
 
 __all__ = [
@@ -14,6 +14,7 @@ __all__ = [
     "ASTNode",
     "NodeMatch",
     "ParseResult",
+    "read_source",
 ]
 
 
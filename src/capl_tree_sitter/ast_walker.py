@@ -50,6 +50,19 @@ class ASTWalker:
             source = source.encode("utf8")
         return source[node.start_byte : node.end_byte].decode("utf8")
 
+    @staticmethod
+    def get_header_text(node: Node, source: bytes | str) -> str:
+        """Extract a node's text up to its first '{', e.g. a function signature.
+
+        Only the header bytes are sliced and decoded, not the whole body.
+        """
+        if isinstance(source, str):
+            source = source.encode("utf8")
+        end = source.find(b"{", node.start_byte, node.end_byte)
+        if end == -1:
+            end = node.end_byte
+        return source[node.start_byte : end].decode("utf8").strip()
+
     @staticmethod
     def get_children_by_type(node: Node, type_name: str) -> list[Node]:
         """Get all direct children of a specific type."""
@@ -23,6 +23,7 @@ class ParseResult:
     tree: Tree
     source: str
     errors: list[str]
+    source_bytes: bytes = b""
 
 
 @dataclass
@@ -1,25 +1,34 @@
 from pathlib import Path
 
 import tree_sitter_c as tsc
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Tree
 
 from .node_types import ParseResult
 
+# Loading the grammar is not free; every parser and query helper shares one
+CAPL_LANGUAGE = Language(tsc.language())
+
+
+def read_source(path: str | Path) -> bytes:
+    """Read a whole source file as bytes.
+
+    The file is opened unbuffered: it is read in one readall() call sized
+    from fstat, so a BufferedReader would only add setup cost.
+    """
+    with open(path, "rb", buffering=0) as f:
+        return f.readall()
+
 
 class CAPLParser:
     """Core CAPL parser using tree-sitter-c"""
 
     def __init__(self):
-        self.language = Language(tsc.language())
+        self.language = CAPL_LANGUAGE
         self.parser = Parser(self.language)
 
     def parse_file(self, path: str | Path) -> ParseResult:
         """Parse a CAPL file from disk"""
-        path = Path(path)
-        with open(path, "rb") as f:
-            source_code = f.read()
-
-        return self.parse_string(source_code)
+        return self.parse_string(read_source(path))
 
     def parse_string(self, source: str | bytes) -> ParseResult:
         """Parse CAPL source code from a string or bytes"""
@@ -32,7 +41,11 @@ class CAPLParser:
         tree = self.parser.parse(source_bytes)
         errors = self._check_for_errors(tree.root_node)
 
-        return ParseResult(tree=tree, source=source, errors=errors)
+        return ParseResult(tree=tree, source=source, errors=errors, source_bytes=source_bytes)
+
+    def parse_tree(self, source_bytes: bytes) -> Tree:
+        """Parse raw bytes and return only the tree (no decode or error scan)"""
+        return self.parser.parse(source_bytes)
 
     def _check_for_errors(self, node) -> list[str]:
         """Check for syntax errors in the AST"""
@@ -1,19 +1,31 @@
-import tree_sitter_c as tsc
-from tree_sitter import Language, Node, Query, QueryCursor
+from typing import ClassVar
+
+from tree_sitter import Node, Query, QueryCursor
 
 from .node_types import NodeMatch
+from .parser import CAPL_LANGUAGE
 
 
 class CAPLQueryHelper:
     """Helper for executing tree-sitter queries on CAPL AST"""
 
+    # Compiled queries shared by all helpers (extractor, xref, dependency, ...)
+    _queries: ClassVar[dict[str, Query]] = {}
+
     def __init__(self):
-        self.language = Language(tsc.language())
+        self.language = CAPL_LANGUAGE
+
+    def compile(self, query_str: str) -> Query:
+        """Compile a query once and reuse it for every subsequent call"""
+        query = self._queries.get(query_str)
+        if query is None:
+            query = Query(self.language, query_str)
+            self._queries[query_str] = query
+        return query
 
     def query(self, query_str: str, node: Node) -> list[NodeMatch]:
         """Execute a query and return matched nodes with captures"""
-        query = Query(self.language, query_str)
-        cursor = QueryCursor(query)
+        cursor = QueryCursor(self.compile(query_str))
 
         matches = []
         # Note: In newer tree-sitter versions, captures() is preferred
@@ -35,3 +47,19 @@ class CAPLQueryHelper:
             )
 
         return matches
+
+    def captures(self, query_str: str, node: Node) -> dict[str, list[Node]]:
+        """Execute a query and return the captured nodes grouped by capture name
+
+        Cheaper than query() when callers only care about which nodes were
+        captured: no per-match dicts or NodeMatch objects are built. Each list
+        is in document order.
+        """
+        captures = QueryCursor(self.compile(query_str)).captures(node)
+        for nodes in captures.values():
+            nodes.sort(key=_start_byte)
+        return captures
+
+
+def _start_byte(node: Node) -> int:
+    return node.start_byte
@@ -1,3 +1,5 @@
+import sqlite3
+
 from capl_symbol_db.database import SymbolDatabase
 from capl_symbol_db.xref import CrossReferenceBuilder
 
@@ -18,3 +20,126 @@ def test_cross_references(tmp_path):
 
     num_refs = xref.analyze_file_references(file_path)
     assert num_refs > 0
+
+
+def test_cross_references_non_ascii(tmp_path):
+    code = """// Überprüfung der Nachrichten
+    void Prüfen() {
+      Senden();
+    }
+    void Senden() {}
+    """
+    file_path = tmp_path / "umlaut.can"
+    file_path.write_text(code, encoding="utf-8")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    CrossReferenceBuilder(db).analyze_file_references(file_path)
+
+    rows = db.conn.execute(
+        "SELECT symbol_name, context FROM symbol_references WHERE reference_type = 'call'"
+    ).fetchall()
+    assert rows == [("Senden", "void Prüfen()")]
+
+
+def test_cross_references_call_not_recorded_as_usage(tmp_path):
+    file_path = tmp_path / "test.can"
+    file_path.write_text("void Func1() {\n  Func2(gValue);\n}\n")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    CrossReferenceBuilder(db).analyze_file_references(file_path)
+
+    rows = db.conn.execute(
+        "SELECT symbol_name, reference_type FROM symbol_references ORDER BY column_number"
+    ).fetchall()
+    assert rows == [("Func2", "call"), ("gValue", "usage")]
+
+
+def test_cross_references_skip_unchanged(tmp_path, monkeypatch):
+    file_path = tmp_path / "test.can"
+    file_path.write_text("void Func1() {\n  Func2();\n}\nvoid Func2() {}\n")
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    xref = CrossReferenceBuilder(db)
+    num_refs = xref.analyze_file_references(file_path)
+
+    parsed = []
+    parse_tree = xref.parser.parse_tree
+    monkeypatch.setattr(
+        xref.parser, "parse_tree", lambda src: parsed.append(src) or parse_tree(src)
+    )
+
+    # Unchanged file with intact references: no re-parse
+    assert xref.analyze_file_references(file_path) == num_refs
+    assert parsed == []
+
+    # References wiped from the DB: re-parse and store again
+    db.clear_file_data(file_path)
+    assert xref.analyze_file_references(file_path) == num_refs
+    assert len(parsed) == 1
+
+    file_path.write_text("void Func1() {\n  Func2();\n  Func2();\n}\nvoid Func2() {}\n")
+    assert xref.analyze_file_references(file_path) > num_refs
+    assert len(parsed) == 2
+
+
+def test_cross_references_analyze_files_parallel(tmp_path):
+    files = []
+    for i in range(3):
+        file_path = tmp_path / f"node{i}.can"
+        file_path.write_text(f"void Func{i}() {{\n  Helper();\n}}\nvoid Helper() {{}}\n")
+        files.append(file_path)
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    counts = CrossReferenceBuilder(db).analyze_files(files, max_workers=2)
+
+    serial_db = SymbolDatabase(str(tmp_path / "serial.db"))
+    serial_xref = CrossReferenceBuilder(serial_db)
+    assert counts == {f.resolve(): serial_xref.analyze_file_references(f) for f in files}
+
+    query = "SELECT symbol_name, line_number, reference_type, context FROM symbol_references"
+    assert sorted(db.conn.execute(query)) == sorted(serial_db.conn.execute(query))
+
+
+def test_cross_references_analyze_files_replaces_references(tmp_path):
+    files = []
+    for i in range(2):
+        file_path = tmp_path / f"node{i}.can"
+        file_path.write_text("void Func() {\n  Helper();\n}\nvoid Helper() {}\n")
+        files.append(file_path)
+
+    db = SymbolDatabase(str(tmp_path / "test.db"))
+    xref = CrossReferenceBuilder(db)
+    for file_path in files:
+        xref.analyze_file_references(file_path)
+    counts = xref.analyze_files(files, max_workers=2)
+
+    stored = db.conn.execute("SELECT COUNT(*) FROM symbol_references").fetchone()[0]
+    assert sum(counts.values()) == stored
+
+
+def test_cross_references_old_schema_is_rebuilt(tmp_path):
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE files (file_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "file_path TEXT UNIQUE NOT NULL, last_parsed TIMESTAMP, parse_success BOOLEAN, "
+        "file_hash TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE symbol_references (ref_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "file_id INTEGER NOT NULL, symbol_name TEXT NOT NULL, line_number INTEGER, "
+        "column_number INTEGER, reference_type TEXT, context TEXT)"
+    )
+    conn.execute("INSERT INTO files (file_path, file_hash) VALUES ('a.can', 'abc')")
+    conn.commit()
+    conn.close()
+
+    db = SymbolDatabase(str(db_path))
+    columns = [row[1] for row in db.conn.execute("PRAGMA table_info(symbol_references)")]
+    assert "ref_id" not in columns
+    sql = db.conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'symbol_references'"
+    ).fetchone()[0]
+    assert "WITHOUT ROWID" in sql
+    # The dropped references are re-derived on the next run
+    assert db.conn.execute("SELECT file_hash FROM files").fetchall() == [(None,)]
@@ -8,13 +8,12 @@ def test_linter_pointer_syntax():
     if Path(db_path).exists():
         Path(db_path).unlink()
 
-    engine = LinterEngine(db_path=db_path)
-
     # Path to the example file
     file_path = Path("examples/Pointers_errors.can")
 
-    # Analyze the file
-    issues = engine.analyze_file(file_path, force=True)
+    # Analyze the file; leaving the block closes the database
+    with LinterEngine(db_path=db_path) as engine:
+        issues = engine.analyze_file(file_path, force=True)
 
     # Filter issues by the new rules E008 and E009
     arrow_issues = [i for i in issues if i.rule_id == "E008"]
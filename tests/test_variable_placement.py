@@ -1,4 +1,5 @@
 from capl_linter.engine import LinterEngine
+from capl_linter.rules.variable_rules import MidBlockVariableRule
 
 
 def test_variable_outside_variables_block(tmp_path):
@@ -13,3 +14,32 @@ def test_variable_outside_variables_block(tmp_path):
 
     # Should find E006
     assert any(i.rule_id == "E006" for i in issues)
+
+
+def test_mid_block_fix_ignores_call_before_definition(tmp_path):
+    code = "\n".join(
+        [
+            "void A() {",
+            "  B();",
+            "  if (1) {",
+            '    write("a");',
+            "  }",
+            "}",
+            "void B() {",
+            '  write("x");',
+            "  int late = 1;",
+            "}",
+        ]
+    )
+    file_path = tmp_path / "test.can"
+    file_path.write_text(code)
+
+    rule = MidBlockVariableRule()
+    engine = LinterEngine(str(tmp_path / "test.db"))
+    issues = engine.analyze_file(file_path, rules=[rule])
+    assert [i.context for i in issues] == ["B"]
+
+    fixed = rule.fix_lines(code.split("\n"), issues)
+    # The declaration moves to the top of B's body, not into A after the call
+    assert fixed[:6] == code.split("\n")[:6]
+    assert fixed[6:] == ["void B() {", "  int late = 1;", '  write("x");', "}"]